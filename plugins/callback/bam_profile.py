@@ -0,0 +1,191 @@
+# Copyright: (c) 2026, Philipp Fromme <philipp.fromme@uni-paderborn.de>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+author:
+  - Philipp Fromme (@pfromme)
+name: bam_profile
+type: aggregate
+short_description: Reports the Address Manager API calls of each task and module
+description:
+  - Collects the API calls the modules of this collection return in
+    C(bc_stats) and prints, at the end of every play, the number of calls,
+    retries, total latency, the 50th, 95th and 99th latency percentile and
+    the bytes sent and received, by task and by module.
+  - The plugin sets the environment variable C(BC_STATS) for the modules it
+    starts, which makes them return their calls. Modules not run on the
+    controller need C(bc_stats=true) instead.
+  - With I(output_file) the report of all plays is also written as JSON or
+    as a Prometheus textfile at the end of the playbook.
+version_added: 0.3.0
+requirements:
+  - enable in configuration
+options:
+  output_file:
+    description: File to write the report of all plays to.
+    type: path
+    env:
+      - name: BAM_PROFILE_OUTPUT_FILE
+    ini:
+      - section: callback_bam_profile
+        key: output_file
+  output_format:
+    description:
+      - Format of I(output_file).
+      - C(prometheus) writes the text exposition format for the textfile
+        collector of the node exporter.
+    type: str
+    default: json
+    choices: ['json', 'prometheus']
+    env:
+      - name: BAM_PROFILE_OUTPUT_FORMAT
+    ini:
+      - section: callback_bam_profile
+        key: output_format
+"""
+
+import json
+import math
+import os
+import tempfile
+
+from ansible.plugins.callback import CallbackBase
+
+COLUMNS = ('calls', 'retries', 'latency', 'p50', 'p95', 'p99', 'request_bytes', 'response_bytes')
+NAME_WIDTH = 48
+
+
+def percentile(values, percent):
+    # nearest rank of the sorted values
+    if not values:
+        return 0.0
+    return values[max(0, int(math.ceil(percent / 100.0 * len(values))) - 1)]
+
+
+def aggregate(calls):
+    latencies = sorted(x['latency'] for x in calls)
+    return {'calls': len(calls),
+            'retries': sum(x.get('retries', 0) for x in calls),
+            'latency': round(sum(latencies), 6),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'request_bytes': sum(x.get('request_bytes', 0) for x in calls),
+            'response_bytes': sum(x.get('response_bytes', 0) for x in calls)}
+
+
+def group_by(calls, key):
+    groups = dict()
+    for call in calls:
+        groups.setdefault(key(call), []).append(call['call'])
+    return groups
+
+
+def label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'local.bluecat.bam_profile'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        # inherited by the module processes of all forks
+        os.environ['BC_STATS'] = '1'
+        self.play = None
+        self.calls = []
+        self.plays = []
+
+    def v2_playbook_on_play_start(self, play):
+        self.end_play()
+        self.play = play.get_name().strip()
+
+    def v2_runner_on_ok(self, result):
+        self.collect(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self.collect(result)
+
+    def v2_playbook_on_stats(self, stats):
+        self.end_play()
+        if self.get_option('output_file'):
+            self.write_report(self.get_option('output_file'), self.get_option('output_format'))
+
+    def collect(self, result):
+        task = result._task
+        module = getattr(task, 'resolved_action', None) or task.action
+        # loops return the results of their items
+        for item in result._result.get('results', [result._result]):
+            stats = item.get('bc_stats') if isinstance(item, dict) else None
+            if not isinstance(stats, dict):
+                continue
+            for call in stats.get('calls', []):
+                self.calls.append({'task': task.get_name().strip(), 'module': module, 'call': call})
+
+    def end_play(self):
+        if not self.calls:
+            return
+        play = {'name': self.play,
+                'tasks': [dict(name=x, module=y, **aggregate(z)) for (x, y), z in
+                          group_by(self.calls, lambda x: (x['task'], x['module'])).items()],
+                'modules': [dict(name=x, **aggregate(y)) for x, y in
+                            group_by(self.calls, lambda x: x['module']).items()]}
+        self.plays.append(play)
+        self.calls = []
+        self.print_play(play)
+
+    def print_play(self, play):
+        self._display.banner('BAM API PROFILE [{}]'.format(play['name']))
+        for title, rows in (('TASK', play['tasks']), ('MODULE', play['modules'])):
+            self._display.display('{:<{}} {:>6} {:>7} {:>9} {:>8} {:>8} {:>8} {:>10} {:>10}'.format(
+                title, NAME_WIDTH, 'CALLS', 'RETRIES', 'LATENCY', 'P50', 'P95', 'P99', 'SENT', 'RECEIVED'))
+            for row in sorted(rows, key=lambda x: x['latency'], reverse=True):
+                self._display.display('{:<{}} {:>6} {:>7} {:>8.3f}s {:>7.3f}s {:>7.3f}s {:>7.3f}s {:>10} {:>10}'.format(
+                    row['name'][:NAME_WIDTH], NAME_WIDTH, *[row[x] for x in COLUMNS]))
+            self._display.display('')
+
+    def write_report(self, path, output_format):
+        if output_format == 'prometheus':
+            content = self.prometheus()
+        else:
+            content = json.dumps({'plays': self.plays}, indent=2) + '\n'
+        path = os.path.expanduser(path)
+        # the textfile collector must never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.bam_profile-')
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+
+    def prometheus(self):
+        metrics = [
+            ('bam_api_calls_total', 'counter', 'Number of Address Manager API calls.', 'calls'),
+            ('bam_api_retries_total', 'counter', 'Number of repeated Address Manager API calls.', 'retries'),
+            ('bam_api_request_bytes_total', 'counter', 'Bytes sent to the Address Manager.', 'request_bytes'),
+            ('bam_api_response_bytes_total', 'counter', 'Bytes received from the Address Manager.',
+             'response_bytes'),
+        ]
+        rows = [(play['name'], row) for play in self.plays for row in play['tasks']]
+        lines = []
+        for name, kind, description, column in metrics:
+            lines += ['# HELP {} {}'.format(name, description), '# TYPE {} {}'.format(name, kind)]
+            for play, row in rows:
+                lines.append('{}{{{}}} {}'.format(name, self.labels(play, row), row[column]))
+        lines += ['# HELP bam_api_latency_seconds Latency of the Address Manager API calls.',
+                  '# TYPE bam_api_latency_seconds summary']
+        for play, row in rows:
+            labels = self.labels(play, row)
+            for quantile, column in (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99')):
+                lines.append('bam_api_latency_seconds{{{},quantile="{}"}} {}'.format(labels, quantile, row[column]))
+            lines.append('bam_api_latency_seconds_sum{{{}}} {}'.format(labels, row['latency']))
+            lines.append('bam_api_latency_seconds_count{{{}}} {}'.format(labels, row['calls']))
+        return '\n'.join(lines) + '\n'
+
+    def labels(self, play, row):
+        return 'play="{}",task="{}",module="{}"'.format(label_value(play), label_value(row['name']),
+                                                         label_value(row['module']))
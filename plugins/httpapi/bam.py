@@ -0,0 +1,95 @@
+# Copyright: (c) 2026, Philipp Fromme <philipp.fromme@uni-paderborn.de>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+author:
+  - Philipp Fromme (@pfromme)
+name: bam
+short_description: HttpApi plugin for the BlueCat Address Manager REST v2 API
+description:
+  - Keeps one authenticated session to the BlueCat Address Manager open for
+    the whole play and sends the requests of all local.bluecat modules through
+    it.
+  - Lookups of the modules are cached for the lifetime of the connection.
+    Writes to a collection drop the cached lookups of that collection.
+version_added: 0.3.0
+options:
+  lookup_cache_size:
+    type: int
+    description:
+      - Maximum number of cached lookup responses.
+    default: 10000
+    vars:
+      - name: ansible_httpapi_bam_lookup_cache_size
+"""
+
+from collections import OrderedDict
+import json
+
+from ansible.module_utils.connection import ConnectionError
+from ansible_collections.ansible.netcommon.plugins.plugin_utils.httpapi_base import HttpApiBase
+from ansible_collections.local.bluecat.plugins.module_utils.bc_util import path_collection
+from bluecat_libraries.address_manager.apiv2 import Client
+from bluecat_libraries.http_client import ErrorResponse, GeneralError
+
+
+class HttpApi(HttpApiBase):
+    def __init__(self, connection):
+        super(HttpApi, self).__init__(connection)
+        self.client = None
+        self.credentials = None
+        self.lookup_cache = OrderedDict()
+
+    def login(self, username, password):
+        self.credentials = (username, password)
+        # the client keeps its requests session, and with it the keep-alive
+        # connection pool, for the lifetime of the persistent connection
+        self.client = Client(self.connection._url,
+                             verify=self.connection.get_option('validate_certs'))
+        self.client.login(username, password)
+
+    def logout(self):
+        if self.client is not None and self.client.is_authenticated:
+            self.client.logout()
+
+    def send_request(self, method, path, params=None, data=None, headers=None, cache=False):
+        key = None
+        if method == 'GET' and cache:
+            key = json.dumps([path, params], sort_keys=True)
+            if key in self.lookup_cache:
+                self.lookup_cache.move_to_end(key)
+                return self.lookup_cache[key]
+        elif method != 'GET':
+            self.invalidate(path_collection(path))
+
+        try:
+            response = self._request(method, path, params, data, headers)
+        except ErrorResponse as exc:
+            raise ConnectionError(str(exc), code=getattr(exc, 'status', None))
+        except GeneralError as exc:
+            raise ConnectionError(str(exc))
+        if isinstance(response, bytes):
+            response = response.decode('utf-8')
+
+        if key is not None:
+            self.lookup_cache[key] = response
+            while len(self.lookup_cache) > self.get_option('lookup_cache_size'):
+                self.lookup_cache.popitem(last=False)
+        return response
+
+    def _request(self, method, path, params, data, headers):
+        try:
+            return self.client.http_request(method, path, params=params, data=data, headers=headers)
+        except ErrorResponse as exc:
+            if getattr(exc, 'status', None) != 401:
+                raise
+        # the session expired while the connection was idle, log in again
+        self.client.login(*self.credentials)
+        return self.client.http_request(method, path, params=params, data=data, headers=headers)
+
+    def invalidate(self, collection):
+        for key in list(self.lookup_cache):
+            if path_collection(json.loads(key)[0]) == collection:
+                del self.lookup_cache[key]
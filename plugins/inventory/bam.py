@@ -0,0 +1,207 @@
+# Copyright: (c) 2026, Philipp Fromme <philipp.fromme@uni-paderborn.de>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+author:
+  - Philipp Fromme (@pfromme)
+name: bam
+short_description: Inventory of the host records in a BlueCat Address Manager
+description:
+  - Adds a host for every HostRecord of a configuration, named by its
+    absoluteName, with the first address as ansible_host.
+  - Hosts are grouped by zone, view, network and, with I(group_by_tags), the
+    tags of their host record. Further groups and variables can be built
+    with the constructed options.
+  - The records of the zones are read in parallel. With the inventory cache
+    enabled, the fetched hosts are cached for I(cache_timeout) seconds.
+version_added: 0.3.0
+extends_documentation_fragment:
+  - constructed
+  - inventory_cache
+options:
+  plugin:
+    description: Token that ensures this is a source file for this plugin.
+    required: true
+    choices: ['local.bluecat.bam']
+  bc_address:
+    description: URL of the BlueCat Address Manager.
+    type: str
+    required: true
+    env:
+      - name: BC_ADDRESS
+  bc_api_username:
+    description: API user.
+    type: str
+    required: true
+    env:
+      - name: BC_API_USERNAME
+  bc_api_password:
+    description: Password of the API user.
+    type: str
+    required: true
+    env:
+      - name: BC_API_PASSWORD
+  validate_certs:
+    description: Whether to verify the TLS certificate of the Address Manager.
+    type: bool
+    default: true
+  configuration:
+    description: Configuration to read the host records from.
+    type: str
+    required: true
+  views:
+    description: Only read the zones of these views. All views by default.
+    type: list
+    elements: str
+    default: []
+  zones:
+    description: Only read these zones (absolute names) and their subzones. All zones by default.
+    type: list
+    elements: str
+    default: []
+  group_by_tags:
+    description: Also request the tags of every host record and add a tag_<name> group per tag.
+    type: bool
+    default: false
+  concurrency:
+    description: Number of zones read at the same time.
+    type: int
+    default: 8
+  page_size:
+    description: Number of objects requested per page.
+    type: int
+    default: 1000
+"""
+
+EXAMPLES = """
+# bam.yml, used with ansible-inventory -i bam.yml --list
+plugin: local.bluecat.bam
+bc_address: https://bam.example.com
+configuration: main
+views:
+  - internal
+cache: true
+cache_plugin: jsonfile
+cache_connection: ~/.ansible/bam_inventory
+cache_timeout: 3600
+keyed_groups:
+  - key: bc_network
+    prefix: net
+"""
+
+import re
+
+from ansible.errors import AnsibleParserError
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable, Constructable
+from ansible_collections.local.bluecat.plugins.module_utils.bc_ipindex import ContainmentIndex
+from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatClient, imap_concurrently, paginate
+from bluecat_libraries.address_manager.apiv2 import Client
+from bluecat_libraries.http_client import GeneralError
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+    NAME = 'local.bluecat.bam'
+
+    def verify_file(self, path):
+        return super(InventoryModule, self).verify_file(path) and path.endswith(('bam.yml', 'bam.yaml'))
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        use_cache = self.get_option('cache') and cache
+        update_cache = self.get_option('cache') and not cache
+        hosts = None
+        if use_cache:
+            try:
+                hosts = self._cache[cache_key]
+            except KeyError:
+                update_cache = True
+        if hosts is None:
+            try:
+                hosts = self.fetch_hosts()
+            except GeneralError as e:
+                # error responses as well as failed connections
+                raise AnsibleParserError('Failed to read the inventory from {}: {}'.format(
+                    self.get_option('bc_address'), e))
+        if update_cache:
+            self._cache[cache_key] = hosts
+        self.populate(hosts)
+
+    def fetch_hosts(self):
+        """Returns the host records as compact, cacheable dicts."""
+        client = BluecatClient(Client(self.get_option('bc_address'), verify=self.get_option('validate_certs')))
+        client.login(self.get_option('bc_api_username'), self.get_option('bc_api_password'))
+        try:
+            return self.read_hosts(client)
+        finally:
+            client.logout()
+
+    def read_hosts(self, client):
+        configuration = self.get_option('configuration')
+        page_size = self.get_option('page_size')
+        concurrency = self.get_option('concurrency')
+        by_configuration = 'configuration.name:eq("{}")'.format(configuration)
+
+        zones = []
+        zone_names = [x.lower().rstrip('.') for x in self.get_option('zones')]
+        views = self.get_option('views')
+        for view in paginate(client, '/views', {'filter': by_configuration}, page_size):
+            if views and view['name'] not in views:
+                continue
+            filter = '{} and view.name:eq("{}")'.format(by_configuration, view['name'])
+            for zone in paginate(client, '/zones', {'filter': filter}, page_size, concurrency):
+                name = zone['absoluteName'].lower()
+                if not zone_names or any(name == x or name.endswith('.' + x) for x in zone_names):
+                    zones.append((view['name'], zone['id'], zone['absoluteName']))
+
+        networks = list(paginate(client, '/networks', {'filter': by_configuration, 'fields': 'id,type,range'},
+                                 page_size, concurrency))
+        index = ContainmentIndex(networks)
+        ranges = {x['id']: x['range'] for x in networks}
+
+        fields = 'embed(addresses),embed(tags)' if self.get_option('group_by_tags') else 'embed(addresses)'
+
+        def fetch(zone):
+            return zone, list(paginate(client, f'/zones/{zone[1]}/resourceRecords',
+                                       {'filter': 'type:eq("HostRecord")', 'fields': fields}, page_size))
+
+        hosts = []
+        for (view, zone_id, zone_name), records in imap_concurrently(fetch, zones, concurrency):
+            for rr in records:
+                embedded = rr.get('_embedded', {})
+                addresses = [x['address'] for x in embedded.get('addresses', [])]
+                network = index.deepest(addresses[0], 'networks') if addresses else None
+                hosts.append({'name': rr['absoluteName'],
+                              'id': rr['id'],
+                              'addresses': addresses,
+                              'view': view,
+                              'zone': zone_name,
+                              'network': ranges.get(network),
+                              'tags': [x['name'] for x in embedded.get('tags', [])]})
+        return hosts
+
+    def populate(self, hosts):
+        strict = self.get_option('strict')
+        for host in hosts:
+            name = host['name']
+            self.inventory.add_host(name)
+            if host['addresses']:
+                self.inventory.set_variable(name, 'ansible_host', host['addresses'][0])
+            hostvars = {'bc_' + x: y for x, y in host.items() if x != 'name'}
+            for key, value in hostvars.items():
+                self.inventory.set_variable(name, key, value)
+            groups = ['view_' + host['view'], 'zone_' + host['zone']]
+            if host['network']:
+                groups.append('network_' + host['network'])
+            groups += ['tag_' + x for x in host['tags']]
+            for group in groups:
+                group = self.inventory.add_group(re.sub(r'[^A-Za-z0-9_]', '_', group))
+                self.inventory.add_child(group, name)
+
+            self._set_composite_vars(self.get_option('compose'), hostvars, name, strict=strict)
+            self._add_host_to_composed_groups(self.get_option('groups'), hostvars, name, strict=strict)
+            self._add_host_to_keyed_groups(self.get_option('keyed_groups'), hostvars, name, strict=strict)
@@ -0,0 +1,204 @@
+# Copyright: (c) 2026, Philipp Fromme <philipp.fromme@uni-paderborn.de>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+author:
+  - Philipp Fromme (@pfromme)
+name: bam
+short_description: Look up objects of a BlueCat Address Manager on the controller
+description:
+  - Returns the objects of the given kind with the given names, for example
+    the ID of a zone for a later task, without running a facts module.
+  - All names of one lookup are resolved with as few C(in()) filtered
+    queries as possible.
+  - With I(bc_cache_dir) results are cached in that directory for
+    I(bc_cache_ttl) seconds, so repeated lookups in a play do not query the
+    Address Manager again. Set the same I(bc_cache_dir) on the modules, their
+    writes drop the cached objects. Without it nothing is kept between
+    lookups. The session token is stored in I(bc_token_store) and reused by
+    all lookups and forks.
+version_added: 0.3.0
+options:
+  _terms:
+    description:
+      - The kind of object, followed by the names to look up.
+      - Kinds are configuration, view, zone, block, network, address,
+        resource_record, server, tag_group, user and group.
+    required: true
+  name:
+    description: A single name to look up, in addition to the terms.
+    type: str
+  fqdn:
+    description: Alias of I(name) for zones and resource records.
+    type: str
+  range:
+    description: Alias of I(name) for blocks and networks.
+    type: str
+  address:
+    description: Alias of I(name) for addresses.
+    type: str
+  configuration:
+    description: Configuration of the objects; required for all kinds but configuration, tag_group, user and group.
+    type: str
+  view:
+    description: Only look up zones and resource records of this view.
+    type: str
+  field:
+    description: Return only this field of each object, e.g. C(id).
+    type: str
+  allow_missing:
+    description: Return null for names that are not found instead of failing.
+    type: bool
+    default: false
+  bc_address:
+    description: URL of the BlueCat Address Manager.
+    type: str
+    required: true
+    env:
+      - name: BC_ADDRESS
+    vars:
+      - name: bc_address
+  bc_api_username:
+    description: API user.
+    type: str
+    required: true
+    env:
+      - name: BC_API_USERNAME
+    vars:
+      - name: bc_api_username
+  bc_api_password:
+    description: Password of the API user.
+    type: str
+    required: true
+    env:
+      - name: BC_API_PASSWORD
+    vars:
+      - name: bc_api_password
+  validate_certs:
+    description: Whether to verify the TLS certificate of the Address Manager.
+    type: bool
+    default: true
+  bc_session_reuse:
+    description: Reuse the session token stored in I(bc_token_store) instead of logging in for every lookup.
+    type: bool
+    default: true
+  bc_token_store:
+    description: Directory of the stored session tokens.
+    type: path
+    default: ~/.ansible/bluecat/tokens
+  bc_cache_dir:
+    description:
+      - Directory of the lookup cache shared with the modules.
+      - Only modules with the same I(bc_cache_dir) invalidate it when they
+        change objects.
+    type: path
+  bc_cache_ttl:
+    description: Seconds a cached lookup is valid.
+    type: int
+    default: 300
+"""
+
+EXAMPLES = """
+- name: Use the ID of a zone
+  ansible.builtin.debug:
+    msg: "{{ lookup('local.bluecat.bam', 'zone', fqdn='example.com', configuration='main', field='id') }}"
+
+- name: Resolve several networks with one query
+  ansible.builtin.set_fact:
+    networks: "{{ query('local.bluecat.bam', 'network', '10.0.1.0/24', '10.0.2.0/24', configuration='main') }}"
+"""
+
+RETURN = """
+_raw:
+  description: The objects, or the I(field) of each object, in the order of the names.
+  type: list
+"""
+
+from ansible.errors import AnsibleLookupError
+from ansible.plugins.lookup import LookupBase
+from ansible_collections.local.bluecat.plugins.module_utils.bc_util import (LookupCache, Resolver, TokenStore,
+                                                                           lookup_cache_dir, login_client)
+from bluecat_libraries.address_manager.apiv2 import BAMV2ErrorResponse
+
+# kind: (collection, field, scoped by configuration)
+KINDS = {
+    'configuration': ('configurations', 'name', False),
+    'view': ('views', 'name', True),
+    'zone': ('zones', 'absoluteName', True),
+    'block': ('blocks', 'range', True),
+    'network': ('networks', 'range', True),
+    'address': ('addresses', 'address', True),
+    'resource_record': ('resourceRecords', 'absoluteName', True),
+    'server': ('servers', 'name', True),
+    'tag_group': ('tagGroups', 'name', False),
+    'user': ('users', 'name', False),
+    'group': ('groups', 'name', False),
+}
+
+# one client, and with it the session and the lookup cache, per Address
+# Manager and user for the lifetime of the process
+CLIENTS = dict()
+
+
+class LookupModule(LookupBase):
+    def get_resolver(self):
+        address = self.get_option('bc_address')
+        username = self.get_option('bc_api_username')
+        key = (address, username)
+        if key not in CLIENTS:
+            token_store = None
+            if self.get_option('bc_session_reuse'):
+                token_store = TokenStore(self.get_option('bc_token_store'))
+            lookup_cache = None
+            if self.get_option('bc_cache_dir'):
+                lookup_cache = LookupCache(lookup_cache_dir(self.get_option('bc_cache_dir'), address),
+                                           self.get_option('bc_cache_ttl'))
+            client = login_client(address, username, self.get_option('bc_api_password'), token_store,
+                                  lookup_cache, verify=self.get_option('validate_certs'))
+            CLIENTS[key] = (client, token_store, lookup_cache)
+        client, token_store, lookup_cache = CLIENTS[key]
+        # modules change objects between the lookups of a play, without a
+        # shared cache directory each lookup starts with an empty cache
+        return Resolver(client, lookup_cache or LookupCache()), token_store
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        if not terms or terms[0] not in KINDS:
+            raise AnsibleLookupError('The first term must be one of {}'.format(', '.join(KINDS)))
+        kind = terms[0]
+        names = list(terms[1:])
+        for option in ('name', 'fqdn', 'range', 'address'):
+            if self.get_option(option):
+                names.append(self.get_option(option))
+        collection, field, scoped = KINDS[kind]
+        configuration = self.get_option('configuration')
+        if scoped and not configuration:
+            raise AnsibleLookupError('Looking up a {} requires a configuration'.format(kind))
+        view = self.get_option('view') if kind in ('zone', 'resource_record') else None
+
+        try:
+            resolver, token_store = self.get_resolver()
+        except BAMV2ErrorResponse as e:
+            raise AnsibleLookupError('Failed to log in to {}: {}'.format(self.get_option('bc_address'), e))
+        try:
+            found = resolver.get_by_field(collection, configuration if scoped else None, field, names, view=view)
+        except BAMV2ErrorResponse as e:
+            raise AnsibleLookupError('Failed to look up {} {}: {}'.format(kind, ', '.join(names), e))
+        finally:
+            if token_store is None:
+                # without session reuse every lookup has a session of its own
+                CLIENTS.pop((self.get_option('bc_address'), self.get_option('bc_api_username')), None)
+                resolver.client.logout()
+
+        missing = [x for x in names if x not in found]
+        if missing and not self.get_option('allow_missing'):
+            raise AnsibleLookupError('No {} found for {}'.format(kind, ', '.join(missing)))
+        results = []
+        for name in names:
+            obj = found.get(name)
+            if obj is not None and self.get_option('field'):
+                obj = obj.get(self.get_option('field'))
+            results.append(obj)
+        return results
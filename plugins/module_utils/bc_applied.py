@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+import fcntl
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+
+# counts the deletes of containers, which other runs of the same module see
+CASCADED = '*'
+
+
+def params_digest(module, params):
+    """Returns a hash of the desired state a task passes to module, leaving
+    out the bc_* connection options."""
+    desired = {x: y for x, y in params.items() if not x.startswith('bc_')}
+    data = json.dumps([module, desired], sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class AppliedCache():
+    """Remembers the desired state last applied to each object, so a rerun of
+    an unchanged task can be answered without any request.
+
+    An entry holds the digest of the task parameters and the write
+    generations of the collections the run read or wrote. Every run that
+    writes to a collection increases its generation, counted per module:
+    an entry is only valid while no other module wrote to one of its
+    collections. Runs of the same module manage other objects and do not
+    count, unless they deleted a container and with it objects of the
+    collection, like the subzones of a zone. Entries older than ttl seconds and a random verify fraction of
+    the valid ones are not used, so changes made outside of Ansible are
+    found eventually."""
+
+    def __init__(self, path, ttl=86400, verify=0.0):
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.verify = verify
+
+    @contextmanager
+    def _generations(self, write=False):
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        fd = os.open(os.path.join(self.path, 'generations'), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if write else fcntl.LOCK_SH)
+            with os.fdopen(os.dup(fd), 'r+') as f:
+                try:
+                    generations = json.load(f)
+                except ValueError:
+                    # new or unreadable store
+                    generations = dict()
+                yield generations
+                if write:
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(generations, f)
+        finally:
+            os.close(fd)
+
+    def _entry_file(self, module, key):
+        name = hashlib.sha256(json.dumps([module, key], default=str).encode('utf-8')).hexdigest()
+        return os.path.join(self.path, 'entries', name)
+
+    @staticmethod
+    def _others(generations, collections, module):
+        return {x: {y: z for y, z in generations.get(x, {}).items() if y != module} for x in collections}
+
+    def hit(self, module, key, digest):
+        """Returns True if the desired state digest was applied to the object
+        key of module and nothing else changed its collections since."""
+        try:
+            with open(self._entry_file(module, key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if entry.get('digest') != digest or entry.get('time', 0) + self.ttl < time.time():
+            return False
+        if random.random() < self.verify:
+            return False
+        return self._others(self.generations(), entry['generations'], module) == entry['generations']
+
+    def generations(self):
+        with self._generations() as generations:
+            return generations
+
+    def written(self, module, collections, cascaded=()):
+        """Increases the write generations of collections for module and
+        those of cascaded, the collections whose objects were deleted with
+        their container, for all modules."""
+        if not collections and not cascaded:
+            return
+        with self._generations(write=True) as generations:
+            for collection, writer in [(x, module) for x in collections] + [(x, CASCADED) for x in cascaded]:
+                counters = generations.setdefault(collection, dict())
+                counters[writer] = counters.get(writer, 0) + 1
+
+    def applied(self, module, key, digest, collections, generations):
+        """Stores that digest was applied to the object key of module by a
+        run that used collections and started at generations, so writes of
+        other runs in the meantime make the entry invalid."""
+        current = self._others(generations, collections, module)
+        entry_file = self._entry_file(module, key)
+        os.makedirs(os.path.dirname(entry_file), mode=0o700, exist_ok=True)
+        # mkstemp creates the file with mode 0600
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(entry_file))
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'digest': digest, 'time': time.time(), 'generations': current}, f)
+        os.replace(tmp_file, entry_file)
@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+import fcntl
+import json
+import os
+import time
+
+
+class DeploymentMarkers():
+    """Remembers on the controller which configurations and services have
+    changes that are not deployed yet, so a play deploys every server and
+    service once instead of after every change.
+
+    Modules that change DNS or DHCP data mark their configuration and
+    services as dirty; a deployment is pending for a server if its
+    configuration was marked for the service after the last deployment
+    started on the server. The markers of one Address Manager are kept in a
+    JSON file changed under an exclusive flock, shared by all forks."""
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+
+    @contextmanager
+    def _markers(self):
+        fd = os.open(os.path.join(self.path, 'markers'), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            with os.fdopen(os.dup(fd), 'r+') as f:
+                try:
+                    markers = json.load(f)
+                except ValueError:
+                    # new or unreadable store
+                    markers = dict()
+                markers.setdefault('dirty', dict())
+                markers.setdefault('deployed', dict())
+                yield markers
+                f.seek(0)
+                f.truncate()
+                json.dump(markers, f)
+        finally:
+            os.close(fd)
+
+    def mark(self, configuration, services):
+        now = time.time()
+        with self._markers() as markers:
+            dirty = markers['dirty'].setdefault(configuration, dict())
+            for service in services:
+                dirty[service] = now
+
+    def pending(self, configuration, server, service):
+        with self._markers() as markers:
+            dirty = markers['dirty'].get(configuration, {}).get(service)
+            deployed = markers['deployed'].get(configuration, {}).get(server, {}).get(service)
+        return dirty is not None and (deployed is None or dirty >= deployed)
+
+    def deployed(self, configuration, server, service, started):
+        """Records a deployment of server that started at started, covering
+        all changes marked before."""
+        with self._markers() as markers:
+            servers = markers['deployed'].setdefault(configuration, dict())
+            servers.setdefault(server, dict())[service] = started
@@ -0,0 +1,241 @@
+import ipaddress
+import re
+
+
+class FilterError(ValueError):
+    pass
+
+
+TOKEN = re.compile(r'''\s*(?:
+    (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|
+    (?P<number>-?\d+(?:\.\d+)?(?![\w.]))|
+    (?P<punct>[():,])|
+    (?P<word>[A-Za-z_][\w.]*)
+    )''', re.VERBOSE)
+
+OPERATORS = ('eq', 'ne', 'contains', 'startsWith', 'endsWith', 'ge', 'gt', 'le', 'lt', 'in')
+IP_FIELDS = ('address', 'range', 'gateway')
+
+
+def tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None:
+            raise FilterError('Invalid filter at {}: {}'.format(position, text[position:]))
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        elif kind == 'number':
+            value = float(value) if '.' in value else int(value)
+        elif kind == 'word' and value in ('true', 'false'):
+            kind, value = 'bool', value == 'true'
+        elif kind == 'word' and value == 'null':
+            kind, value = 'null', None
+        tokens.append((kind, value))
+    return tokens
+
+
+class Parser():
+    """Parses a BAM v2 filter into a tree of tuples:
+    ('and', [nodes]), ('or', [nodes]), ('not', node) and
+    ('cmp', field, operator, [values])."""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return (None, None)
+
+    def take(self, kind=None, value=None):
+        token = self.peek()
+        if token[0] is None or (kind and token[0] != kind) or (value and token[1] != value):
+            raise FilterError('Unexpected {} in filter: {}'.format(token[1] or 'end', self.text))
+        self.position += 1
+        return token[1]
+
+    def parse(self):
+        node = self.expression()
+        if self.peek()[0] is not None:
+            raise FilterError('Unexpected {} in filter: {}'.format(self.peek()[1], self.text))
+        return node
+
+    def expression(self):
+        nodes = [self.term()]
+        while self.peek() == ('word', 'or'):
+            self.take()
+            nodes.append(self.term())
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+    def term(self):
+        nodes = [self.factor()]
+        while self.peek() == ('word', 'and'):
+            self.take()
+            nodes.append(self.factor())
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+    def factor(self):
+        if self.peek() == ('word', 'not'):
+            self.take()
+            return ('not', self.factor())
+        if self.peek() == ('punct', '('):
+            self.take()
+            node = self.expression()
+            self.take('punct', ')')
+            return node
+        field = self.take('word')
+        self.take('punct', ':')
+        operator = self.take('word')
+        if operator not in OPERATORS:
+            raise FilterError('Unknown operator {} in filter: {}'.format(operator, self.text))
+        self.take('punct', '(')
+        values = [self.value()]
+        while self.peek() == ('punct', ','):
+            self.take()
+            values.append(self.value())
+        self.take('punct', ')')
+        return ('cmp', field, operator, values)
+
+    def value(self):
+        kind, value = self.peek()
+        if kind not in ('string', 'number', 'bool', 'null'):
+            raise FilterError('Expected a value instead of {} in filter: {}'.format(value, self.text))
+        self.take()
+        return value
+
+
+def parse(text):
+    return Parser(text).parse()
+
+
+def get_field(obj, field):
+    for key in field.split('.'):
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+def ip_value(value):
+    try:
+        return ipaddress.ip_network(value, strict=False)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize(field, value):
+    """Returns the canonical form of an address or range, so '2001:DB8::/64'
+    and '2001:db8:0::/64' compare equal, and any other value unchanged."""
+    if field.split('.')[-1] in IP_FIELDS and isinstance(value, str):
+        network = ip_value(value)
+        if network is not None:
+            if '/' not in value:
+                return str(network.network_address)
+            return str(network)
+    return value
+
+
+def compare(field, operator, actual, expected):
+    if expected is None:
+        # field:eq(null) matches objects without the field
+        return (actual is None) == (operator == 'eq')
+    if actual is None:
+        return operator == 'ne'
+    if field.split('.')[-1] in IP_FIELDS:
+        actual_ip, expected_ip = ip_value(actual), ip_value(expected)
+        if actual_ip is not None and expected_ip is not None and actual_ip.version == expected_ip.version:
+            if operator == 'contains':
+                return expected_ip.subnet_of(actual_ip)
+            if operator in ('ge', 'gt', 'le', 'lt') and '/' in str(actual) and '/' in str(expected):
+                # ranges compare by containment, range:ge("10.0.1.0/24")
+                # matches 10.0.1.0/24 and every range around it
+                if operator in ('ge', 'gt'):
+                    return actual_ip.supernet_of(expected_ip) and (operator == 'ge' or actual_ip != expected_ip)
+                return actual_ip.subnet_of(expected_ip) and (operator == 'le' or actual_ip != expected_ip)
+            if operator in ('eq', 'ne', 'ge', 'gt', 'le', 'lt'):
+                actual, expected = (actual_ip.network_address, actual_ip.prefixlen), \
+                                   (expected_ip.network_address, expected_ip.prefixlen)
+    if isinstance(actual, str) and isinstance(expected, str) and operator in ('eq', 'ne'):
+        actual, expected = actual.lower(), expected.lower()
+    try:
+        if operator == 'eq':
+            return actual == expected
+        if operator == 'ne':
+            return actual != expected
+        if operator == 'ge':
+            return actual >= expected
+        if operator == 'gt':
+            return actual > expected
+        if operator == 'le':
+            return actual <= expected
+        if operator == 'lt':
+            return actual < expected
+    except TypeError:
+        return False
+    actual, expected = str(actual).lower(), str(expected).lower()
+    if operator == 'contains':
+        return expected in actual
+    if operator == 'startsWith':
+        return actual.startswith(expected)
+    return actual.endswith(expected)
+
+
+def evaluate(node, obj):
+    """Returns whether obj matches the parsed filter node."""
+    kind = node[0]
+    if kind == 'and':
+        return all(evaluate(x, obj) for x in node[1])
+    if kind == 'or':
+        return any(evaluate(x, obj) for x in node[1])
+    if kind == 'not':
+        return not evaluate(node[1], obj)
+    _, field, operator, values = node
+    actual = get_field(obj, field)
+    if operator == 'in':
+        return any(compare(field, 'eq', actual, x) for x in values)
+    return compare(field, operator, actual, values[0])
+
+
+def compile_filter(text):
+    """Returns a predicate for objects matching the filter text; an empty
+    filter matches everything."""
+    if not text:
+        return lambda obj: True
+    node = parse(text)
+    return lambda obj: evaluate(node, obj)
+
+
+def equalities(node):
+    """Returns {field: [values]} of the eq and in comparisons every match of
+    the node has to satisfy, for looking them up in an index first."""
+    if node[0] == 'cmp' and node[2] in ('eq', 'in'):
+        if None in node[3]:
+            # an index does not hold the objects without the field
+            return dict()
+        return {node[1]: [normalize(node[1], x) for x in node[3]]}
+    result = dict()
+    if node[0] == 'and':
+        for child in node[1]:
+            for field, values in equalities(child).items():
+                if field not in result:
+                    result[field] = values
+    return result
+
+
+def select_fields(obj, fields):
+    """Applies the fields query parameter: 'id,name' keeps only these keys,
+    embed(...) entries only ask for linked objects and keep the rest."""
+    if not fields:
+        return obj
+    names = [x.strip() for x in re.sub(r'embed\([^)]*\)', '', fields).split(',') if x.strip()]
+    if not names:
+        return obj
+    return {x: obj[x] for x in names if x in obj}
@@ -0,0 +1,122 @@
+from bisect import bisect_right
+import ipaddress
+
+
+def ip_range(value):
+    """Returns (version, first, last) as integers for an address or a CIDR range."""
+    network = ipaddress.ip_network(value, strict=False)
+    return network.version, int(network.network_address), int(network.broadcast_address)
+
+
+class ContainmentIndex():
+    """Finds the deepest block or network containing an address or range.
+
+    Blocks and networks of a configuration never partially overlap, so sorted
+    by (first address, -last address) every range that contains a query is
+    either the last range starting at or before the query or one of its
+    ancestors. A lookup is a bisect plus a walk up the parent chain."""
+
+    def __init__(self, objects):
+        self.ranges = {4: [], 6: []}
+        for obj in objects:
+            version, first, last = ip_range(obj['range'])
+            # blocks sort before networks with the same range, they are the parent
+            self.ranges[version].append((first, -last, 0 if obj['type'].lower().endswith('block') else 1, obj['id']))
+        self.starts = dict()
+        self.parents = dict()
+        for version, ranges in self.ranges.items():
+            ranges.sort()
+            parents = []
+            stack = []
+            for i, (first, neg_last, _, _) in enumerate(ranges):
+                while stack and -ranges[stack[-1]][1] < first:
+                    stack.pop()
+                parents.append(stack[-1] if stack else -1)
+                stack.append(i)
+            self.starts[version] = [x[0] for x in ranges]
+            self.parents[version] = parents
+
+    def deepest(self, value, collection=None, exclude=None):
+        """Returns the ID of the deepest block (collection 'blocks'), network
+        ('networks') or either (None) containing value, or None. The object
+        with ID exclude is skipped, to find the parent of a block."""
+        version, first, last = ip_range(value)
+        ranges = self.ranges[version]
+        i = bisect_right(self.starts[version], first) - 1
+        while i >= 0:
+            range_first, neg_last, kind, id = ranges[i]
+            if -neg_last >= last and id != exclude and \
+                    (collection is None or kind == (0 if collection == 'blocks' else 1)):
+                return id
+            i = self.parents[version][i]
+        return None
+
+
+# largest network tracked with a bitmap, 2 MiB for an IPv4 /8
+BITMAP_MAX_SIZE = 1 << 24
+
+
+def ip_address(version, value):
+    return ipaddress.IPv4Address(value) if version == 4 else ipaddress.IPv6Address(value)
+
+
+class AddressSet():
+    """The used addresses of a network. Networks up to BITMAP_MAX_SIZE
+    addresses keep one bit per address (8 KiB for a /16), larger IPv6
+    networks a set of the used offsets."""
+
+    def __init__(self, range):
+        self.version, self.first, self.last = ip_range(range)
+        size = self.last - self.first + 1
+        self.bitmap = bytearray((size + 7) // 8) if size <= BITMAP_MAX_SIZE else None
+        self.used = set()
+
+    def add(self, address):
+        offset = int(ipaddress.ip_address(address)) - self.first
+        if offset < 0 or offset > self.last - self.first:
+            return
+        if self.bitmap is not None:
+            self.bitmap[offset >> 3] |= 1 << (offset & 7)
+        else:
+            self.used.add(offset)
+
+    def free(self):
+        """Yields the free addresses in ascending order, leaving out the
+        network address and the broadcast address of IPv4 networks."""
+        offset, last = 0, self.last - self.first
+        if last > 1:
+            offset = 1
+            if self.version == 4:
+                last -= 1
+        while offset <= last:
+            if self.bitmap is not None:
+                byte = self.bitmap[offset >> 3]
+                if byte == 0xff:
+                    offset = (offset | 7) + 1
+                    continue
+                if byte & (1 << (offset & 7)):
+                    offset += 1
+                    continue
+            elif offset in self.used:
+                offset += 1
+                continue
+            yield ip_address(self.version, self.first + offset)
+            offset += 1
+
+
+def free_networks(range, used, prefix_length):
+    """Yields the free networks with prefix_length inside range in ascending
+    order. used are the (first, last) integer tuples of the blocks and
+    networks already taken inside range."""
+    version, first, last = ip_range(range)
+    size = 1 << ((32 if version == 4 else 128) - prefix_length)
+    candidate = -(-first // size) * size
+    # the sentinel after the end of range yields the tail
+    for used_first, used_last in sorted(used) + [(last + 1, last + 1)]:
+        while candidate + size - 1 < used_first:
+            if candidate + size - 1 > last:
+                return
+            yield ipaddress.ip_network((ip_address(version, candidate), prefix_length))
+            candidate += size
+        if used_last >= candidate:
+            candidate = -(-(used_last + 1) // size) * size
@@ -0,0 +1,318 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+from ansible_collections.local.bluecat.plugins.module_utils.bc_filter import (equalities, evaluate, normalize, parse,
+                                                                              select_fields)
+
+SNAPSHOT_COLLECTIONS = ['configurations', 'views', 'zones', 'resourceRecords', 'blocks', 'networks', 'addresses',
+                        'tagGroups', 'tags', 'accessRights', 'deploymentRoles']
+# columns holding a lower-cased copy of the field for index lookups
+INDEXED_FIELDS = ('type', 'name', 'absoluteName', 'range', 'address')
+BATCH_SIZE = 10000
+# queries whose next page start is remembered per Snapshot
+MAX_CURSORS = 64
+
+SCHEMA = [
+    'CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)',
+    'CREATE TABLE objects (collection TEXT NOT NULL, id INTEGER NOT NULL, parent_id INTEGER, '
+    'type TEXT, name TEXT, absoluteName TEXT, range TEXT, address TEXT, data TEXT NOT NULL, '
+    'PRIMARY KEY (collection, id))',
+]
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS objects_id ON objects (id)',
+    'CREATE INDEX IF NOT EXISTS objects_parent ON objects (parent_id, collection)',
+    'CREATE INDEX IF NOT EXISTS objects_name ON objects (name)',
+    'CREATE INDEX IF NOT EXISTS objects_absolute_name ON objects (absoluteName)',
+    'CREATE INDEX IF NOT EXISTS objects_range ON objects (range)',
+    'CREATE INDEX IF NOT EXISTS objects_address ON objects (address)',
+]
+
+
+class SnapshotError(Exception):
+    def __init__(self, message, status=None):
+        super(SnapshotError, self).__init__(message)
+        self.status = status
+
+
+def index_value(field, value):
+    value = normalize(field, value)
+    return value.lower() if isinstance(value, str) else value
+
+
+def indexed(node):
+    """Returns whether the index lookups of equalities() alone select exactly
+    the objects matching the node, so nothing is left to check per object."""
+    comparisons = []
+
+    def collect(node):
+        if node[0] == 'and':
+            return all(collect(x) for x in node[1])
+        if node[0] != 'cmp' or node[2] not in ('eq', 'in') or None in node[3]:
+            return False
+        comparisons.append(node[1])
+        return node[1] == 'id' or node[1] in INDEXED_FIELDS
+
+    # equalities() only looks up the first comparison of a field
+    return collect(node) and len(comparisons) == len(set(comparisons))
+
+
+def object_row(collection, obj, parent_id=None):
+    return (collection, obj['id'], parent_id) + \
+        tuple(index_value(x, obj.get(x)) for x in INDEXED_FIELDS) + (json.dumps(obj),)
+
+
+class SnapshotStore():
+    """Batches object rows into executemany calls on a snapshot database."""
+
+    def __init__(self, db, batch_size=BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.rows = []
+        self.counts = dict()
+
+    def add(self, collection, obj, parent_id=None):
+        self.rows.append(object_row(collection, obj, parent_id))
+        self.counts[collection] = self.counts.get(collection, 0) + 1
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        self.db.executemany('INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', self.rows)
+        self.rows = []
+
+    def delete(self, collection, ids):
+        self.flush()
+        self.db.executemany('DELETE FROM objects WHERE collection = ? AND id = ?', [(collection, x) for x in ids])
+
+    def clear(self, collection):
+        self.flush()
+        self.db.execute('DELETE FROM objects WHERE collection = ?', (collection,))
+
+    def select(self, collection, *columns):
+        """Yields (id, *columns) of a collection ordered by id, reading
+        batch_size rows at a time so rows may be changed in between."""
+        self.flush()
+        last = None
+        while True:
+            sql = 'SELECT {} FROM objects WHERE collection = ?{} ORDER BY id LIMIT ?'.format(
+                ', '.join(('id',) + columns), '' if last is None else ' AND id > ?')
+            args = [collection] + ([] if last is None else [last]) + [self.batch_size]
+            rows = self.db.execute(sql, args).fetchall()
+            yield from rows
+            if len(rows) < self.batch_size:
+                return
+            last = rows[-1][0]
+
+    def set_parents(self, collection, parents):
+        self.flush()
+        self.db.executemany('UPDATE objects SET parent_id = ? WHERE collection = ? AND id = ?',
+                            [(x, collection, y) for x, y in parents])
+
+    def set_meta(self, key, value):
+        self.db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, json.dumps(value)))
+
+
+class SnapshotWriter(SnapshotStore):
+    """Writes a new snapshot next to path in bulk transactions of batch_size
+    rows and only replaces path once it is complete, so readers never see a
+    partial snapshot. The indexes are created after the data is loaded."""
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        self.path = path
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.snapshot-')
+        os.close(fd)
+        db = sqlite3.connect(self.tmp_path)
+        db.execute('PRAGMA journal_mode=OFF')
+        db.execute('PRAGMA synchronous=OFF')
+        for statement in SCHEMA:
+            db.execute(statement)
+        self.meta = dict()
+        super(SnapshotWriter, self).__init__(db, batch_size)
+
+    def flush(self):
+        with self.db:
+            super(SnapshotWriter, self).flush()
+
+    def close(self):
+        self.flush()
+        with self.db:
+            for statement in INDEXES:
+                self.db.execute(statement)
+        self.db.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self.db.close()
+        os.unlink(self.tmp_path)
+
+
+class SnapshotUpdater(SnapshotStore):
+    """Changes an existing snapshot in place in a single transaction, so
+    readers see either the previous or the updated state."""
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        self.path = path
+        db = sqlite3.connect(path)
+        self.meta = {x: json.loads(y) for x, y in db.execute('SELECT key, value FROM meta')}
+        super(SnapshotUpdater, self).__init__(db, batch_size)
+
+    def close(self):
+        self.flush()
+        self.db.commit()
+        self.db.close()
+
+    def abort(self):
+        self.db.rollback()
+        self.db.close()
+
+
+def diff_sorted(local, remote):
+    """Merges two ascending streams of ids and yields (id, None) for ids only
+    in local and (None, id) for ids only in remote, holding one id of each."""
+    local, remote = iter(local), iter(remote)
+    local_id, remote_id = next(local, None), next(remote, None)
+    while local_id is not None or remote_id is not None:
+        if remote_id is None or (local_id is not None and local_id < remote_id):
+            yield local_id, None
+            local_id = next(local, None)
+        elif local_id is None or remote_id < local_id:
+            yield None, remote_id
+            remote_id = next_ascending(remote, remote_id)
+        else:
+            local_id = next(local, None)
+            remote_id = next_ascending(remote, remote_id)
+
+
+def next_ascending(ids, previous):
+    value = next(ids, None)
+    if value is not None and value <= previous:
+        # merging an unordered listing would report objects as deleted
+        raise SnapshotError('Ids are not in ascending order ({} after {})'.format(value, previous))
+    return value
+
+
+class Snapshot():
+    """Reads a snapshot written by the export_snapshot module. Queries take
+    the same filters as BAM; eq and in comparisons on indexed fields are
+    looked up in the indexes, everything else is checked per object."""
+
+    def __init__(self, path):
+        if not os.path.isfile(path):
+            raise SnapshotError('Snapshot {} does not exist'.format(path))
+        self.path = path
+        self.db = sqlite3.connect('file:{}?mode=ro'.format(path), uri=True, check_same_thread=False)
+        # paginate may query from several threads
+        self.lock = threading.Lock()
+        # (collection, filter, parent_id, id, offset) -> id of the object
+        # before that offset, so paging through a query stays linear
+        self.cursors = dict()
+        self.meta = {x: json.loads(y) for x, y in self.db.execute('SELECT key, value FROM meta')}
+
+    def query(self, collection, filter=None, fields=None, parent_id=None, id=None, limit=None, offset=0,
+              total=False):
+        """Returns (objects, totalCount) of a page. The page is cut in SQL
+        unless part of the filter has to be checked per object; then the
+        objects are decoded from the start, or from the id the previous page
+        of the same query ended at. totalCount is only counted when asked for
+        and the filter is answered by the indexes alone, as BAM may omit it."""
+        if collection not in self.meta.get('collections', []):
+            raise SnapshotError('Collection {} is not part of snapshot {}'.format(collection, self.path), 404)
+        node = parse(filter) if filter else None
+        where = ['collection = ?']
+        args = [collection]
+        if parent_id is not None:
+            where.append('parent_id = ?')
+            args.append(parent_id)
+        if id is not None:
+            where.append('id = ?')
+            args.append(id)
+        if node is not None:
+            for field, values in equalities(node).items():
+                if field == 'id' or field in INDEXED_FIELDS:
+                    where.append('{} IN ({})'.format(field, ', '.join('?' * len(values))))
+                    args += [index_value(field, x) for x in values]
+            if indexed(node):
+                node = None
+        key = (collection, filter, parent_id, id)
+        start = offset
+        with self.lock:
+            count = None
+            if total and node is None:
+                sql = 'SELECT COUNT(*) FROM objects WHERE {}'.format(' AND '.join(where))
+                count = self.db.execute(sql, args).fetchone()[0]
+            # pages fetched ahead may come in before the one they follow,
+            # they start from the closest page end known before them
+            ends = [x[-1] for x in self.cursors if x[:-1] == key and x[-1] <= offset]
+            if ends:
+                where.append('id > ?')
+                args.append(self.cursors[key + (max(ends),)])
+                offset -= max(ends)
+            sql = 'SELECT id, data FROM objects WHERE {} ORDER BY id'.format(' AND '.join(where))
+            if node is None:
+                sql += ' LIMIT ? OFFSET ?'
+                args += [-1 if limit is None else limit, offset]
+                offset = 0
+            data = []
+            matched = 0
+            for row_id, row in self.db.execute(sql, args):
+                obj = json.loads(row)
+                if node is not None and not evaluate(node, obj):
+                    continue
+                matched += 1
+                if matched > offset:
+                    data.append(select_fields(obj, fields))
+                    last_id = row_id
+                    if limit is not None and len(data) >= limit:
+                        break
+            if limit is not None and len(data) >= limit:
+                self.cursors[key + (start + len(data),)] = last_id
+                while len(self.cursors) > MAX_CURSORS:
+                    del self.cursors[next(iter(self.cursors))]
+        return data, count
+
+
+class SnapshotClient():
+    """Answers the GET requests of BluecatClient from a Snapshot, so the facts
+    modules and the resolvers work on it unchanged. '/zones/5/resourceRecords'
+    returns the records exported from zone 5, '/zones/5' the zone itself."""
+
+    def __init__(self, path):
+        self.snapshot = Snapshot(path)
+
+    def http_request(self, method, url, params=None, **kwargs):
+        if method != 'GET':
+            raise SnapshotError('Cannot {} {}, snapshots are read-only'.format(method, url), 405)
+        params = params or {}
+        segments = [x for x in url.split('?')[0].split('/') if x]
+        query = dict(filter=params.get('filter'), fields=params.get('fields'))
+        if segments[-1].isdigit():
+            data, _ = self.snapshot.query(segments[-2], id=int(segments[-1]), **query)
+            if not data:
+                raise SnapshotError('No {} with id {} in snapshot'.format(segments[-2], segments[-1]), 404)
+            return data[0]
+        if len(segments) > 1:
+            query['parent_id'] = int(segments[-2])
+        data, total = self.snapshot.query(segments[-1], limit=params.get('limit'), offset=params.get('offset') or 0,
+                                          total=params.get('total') == 'true', **query)
+        response = {'count': len(data), 'data': data}
+        if total is not None:
+            response['totalCount'] = total
+        return response
+
+    def http_get(self, url, params=None, **kwargs):
+        return self.http_request('GET', url, params=params, **kwargs)
+
+    def http_post(self, url, params=None, data=None, **kwargs):
+        return self.http_request('POST', url, params=params, data=data, **kwargs)
+
+    def http_put(self, url, params=None, data=None, **kwargs):
+        return self.http_request('PUT', url, params=params, data=data, **kwargs)
+
+    def http_patch(self, url, params=None, data=None, **kwargs):
+        return self.http_request('PATCH', url, params=params, data=data, **kwargs)
+
+    def http_delete(self, url, params=None, **kwargs):
+        return self.http_request('DELETE', url, params=params, **kwargs)
@@ -0,0 +1,62 @@
+import json
+import os
+import re
+import threading
+import time
+
+
+def path_template(url):
+    """Returns the path of url with its IDs replaced, so '/zones/5/resourceRecords'
+    and '/zones/7/resourceRecords' are counted as '/zones/{id}/resourceRecords'."""
+    path = url.split('?')[0]
+    return re.sub(r'/\d+(?=/|$)', '/{id}', path)
+
+
+def payload_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, bytes):
+        return len(value)
+    if not isinstance(value, str):
+        value = json.dumps(value)
+    return len(value.encode('utf-8'))
+
+
+class RequestStats():
+    """Records the requests of a module run: method, path template, status,
+    latency in seconds, request and response bytes and retries of each call.
+
+    With a trace_file every call is also appended to it as a JSON line,
+    together with the fields of context."""
+
+    def __init__(self, trace_file=None, context=None):
+        self.trace_file = os.path.expanduser(trace_file) if trace_file else None
+        self.context = context or dict()
+        self.calls = []
+        # paginate and the bulk modules send requests from several threads
+        self.lock = threading.Lock()
+
+    def record(self, method, url, status, latency, request_bytes, response_bytes, retries):
+        call = {'method': method.upper(),
+                'path': path_template(url),
+                'status': status,
+                'latency': round(latency, 6),
+                'request_bytes': request_bytes,
+                'response_bytes': response_bytes,
+                'retries': retries}
+        with self.lock:
+            self.calls.append(call)
+            if self.trace_file:
+                line = dict(self.context, time=time.time(), **call)
+                with open(self.trace_file, 'a') as f:
+                    f.write(json.dumps(line) + '\n')
+
+    def summary(self):
+        with self.lock:
+            calls = list(self.calls)
+        return {'requests': len(calls),
+                'retries': sum(x['retries'] for x in calls),
+                'latency': round(sum(x['latency'] for x in calls), 6),
+                'request_bytes': sum(x['request_bytes'] for x in calls),
+                'response_bytes': sum(x['response_bytes'] for x in calls),
+                'calls': calls}
@@ -0,0 +1,79 @@
+from contextlib import contextmanager
+import fcntl
+import json
+import os
+import random
+import time
+
+# seconds between two attempts to get a free in-flight slot
+SLOT_POLL_MIN = 0.005
+SLOT_POLL_MAX = 0.1
+
+
+class Throttle():
+    """Limits the requests to one Address Manager across all processes of the
+    host, so the forks of a play together stay below max_rps requests per
+    second and max_inflight concurrent requests.
+
+    The rate is a token bucket of max_rps tokens kept in a file, changed under
+    an exclusive flock. Each request takes a token; if the bucket is empty it
+    reserves the next one and waits for it outside of the lock. In-flight
+    requests hold an flock on one of max_inflight slot files. Locks are
+    released by the kernel when a process dies, so crashed forks never keep
+    a slot."""
+
+    def __init__(self, path, max_rps=None, max_inflight=None):
+        self.path = os.path.expanduser(path)
+        self.max_rps = max_rps or None
+        self.max_inflight = max_inflight or None
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+
+    @contextmanager
+    def slot(self):
+        """Waits until a request may be sent and holds an in-flight slot
+        while it runs."""
+        fd = self._acquire_slot() if self.max_inflight else None
+        try:
+            if self.max_rps:
+                self._take_token()
+            yield
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def _acquire_slot(self):
+        delay = SLOT_POLL_MIN
+        while True:
+            # start at a random slot so the processes do not all try slot 0
+            first = random.randrange(self.max_inflight)
+            for i in range(self.max_inflight):
+                name = os.path.join(self.path, 'slot-{}'.format((first + i) % self.max_inflight))
+                fd = os.open(name, os.O_RDWR | os.O_CREAT, 0o600)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except OSError:
+                    os.close(fd)
+            time.sleep(random.uniform(0, delay))
+            delay = min(delay * 2, SLOT_POLL_MAX)
+
+    def _take_token(self):
+        fd = os.open(os.path.join(self.path, 'bucket'), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()
+            try:
+                state = json.loads(os.read(fd, 1024))
+                tokens = min(self.max_rps, state['tokens'] + (now - state['time']) * self.max_rps)
+            except (ValueError, KeyError, TypeError):
+                # new or unreadable bucket
+                tokens = self.max_rps
+            # a negative balance is the queue of processes waiting for a token
+            tokens -= 1
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps({'tokens': tokens, 'time': now}).encode('utf-8'))
+        finally:
+            os.close(fd)
+        if tokens < 0:
+            time.sleep(-tokens / self.max_rps)
@@ -1,65 +1,843 @@
+from collections import deque, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import copy
+import datetime
+from email.utils import parsedate_to_datetime
+import hashlib
+import ipaddress
+import itertools
+import json
+import os
+import queue
+import random
+import shutil
+import tempfile
+import threading
+import time
+
 from ansible.module_utils.basic import AnsibleModule
-from bluecat_libraries.address_manager.apiv2 import Client, MediaType
+from ansible.module_utils.connection import Connection
+from ansible_collections.local.bluecat.plugins.module_utils.bc_applied import AppliedCache, params_digest
+from ansible_collections.local.bluecat.plugins.module_utils.bc_deploy import DeploymentMarkers
+from ansible_collections.local.bluecat.plugins.module_utils.bc_ipindex import ContainmentIndex
+from ansible_collections.local.bluecat.plugins.module_utils.bc_snapshot import SnapshotClient, SnapshotError, index_value
+from ansible_collections.local.bluecat.plugins.module_utils.bc_stats import RequestStats, payload_size
+from ansible_collections.local.bluecat.plugins.module_utils.bc_throttle import Throttle
+from bluecat_libraries.address_manager.apiv2 import BAMV2ErrorResponse, Client, MediaType
+from bluecat_libraries.http_client import GeneralError
+import requests
+from urllib3.exceptions import NewConnectionError
 
-class BluecatModule():
-    def __init__(self, module_args, required_if=None, bypass_checks=False,
-                 no_log=False, mutually_exclusive=None, required_together=None,
-                 required_one_of=None, add_file_common_args=False,
-                 supports_check_mode=False, is_fact=False):
+# tokens that expire within this many seconds are not reused anymore
+TOKEN_EXPIRY_MARGIN = 60
+# number of resolved objects kept in memory per module run
+LOOKUP_CACHE_SIZE = 1024
+# collections whose objects are deleted along with their container, which
+# may be of the same collection like the subzones of a zone; only the direct
+# children are listed, see contained_collections
+CONTAINED_COLLECTIONS = {
+    'configurations': ['views', 'blocks', 'servers'],
+    'views': ['zones'],
+    'zones': ['zones', 'resourceRecords'],
+    'blocks': ['blocks', 'networks'],
+    'networks': ['addresses'],
+    'servers': ['interfaces'],
+    'tagGroups': ['tags'],
+    'tags': ['tags'],
+}
+# number of objects requested per page when walking a collection
+PAGE_SIZE = 1000
+# upper limit for parallel requests of a single module run
+MAX_CONCURRENCY = 16
+# upper limit for the length of a filter combining several values, to keep
+# the request URL below common length limits
+FILTER_MAX_LENGTH = 4000
+# failed requests are repeated up to RETRIES times, waiting a random time of
+# up to RETRY_BACKOFF_BASE * 2^attempt seconds, but never more than BACKOFF_MAX
+RETRIES = 3
+RETRY_BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
 
-        argument_spec = dict(bc_address=dict(type='str'),
-                             bc_api_username=dict(type='str'),
-                             bc_api_password=dict(type='str', no_log=True)
-                             )
-        if is_fact:
-            fact_argument_spec = dict(
-                filter=dict(required=True, type='str'),
-                fields=dict(type='str'),
-                limit=dict(type='int', default=100)
-            )
-            argument_spec.update(fact_argument_spec)
-        argument_spec.update(module_args)
-        self.module = AnsibleModule(argument_spec=argument_spec,
-                                    required_if=required_if,
-                                    bypass_checks=bypass_checks,
-                                    no_log=no_log,
-                                    mutually_exclusive=mutually_exclusive,
-                                    required_together=required_together,
-                                    required_one_of=required_one_of,
-                                    add_file_common_args=add_file_common_args,
-                                    supports_check_mode=supports_check_mode)
-        self.check_mode = self.module.check_mode
-        self.headers = {"Content-Type": MediaType.JSON}
-        self.client = None
-        self.login(self.module.params)
-        result = self.exec_module(**self.module.params)
-        self.exit_json(**result)
+# GET responses with more objects are not kept by the request memo
+MEMO_MAX_OBJECTS = 100
+# prefix of the request paths of the REST API v2
+API_PATH = '/api/v2'
 
-    def login(self, params):
-        self.client = Client(params.get('bc_address'))
-        self.client.login(params.get('bc_api_username'), params.get('bc_api_password'))
+
+def write_json_atomic(path, data):
+    # mkstemp creates the file with mode 0600
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_file, path)
+
+
+class TokenStore():
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+
+    def _token_file(self, address, username):
+        key = hashlib.sha256('{}\0{}'.format(address, username).encode('utf-8')).hexdigest()
+        return os.path.join(self.path, key)
+
+    def get(self, address, username):
+        token_file = self._token_file(address, username)
+        try:
+            # never trust a token file other users could have written or read
+            if os.stat(token_file).st_mode & 0o077:
+                return None
+            with open(token_file) as f:
+                token = json.load(f)
+        except (OSError, ValueError):
+            return None
+        expires = token.get('expires')
+        if expires is not None and expires - TOKEN_EXPIRY_MARGIN < time.time():
+            return None
+        return token.get('auth')
+
+    def put(self, address, username, auth, expires=None):
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        os.chmod(self.path, 0o700)
+        write_json_atomic(self._token_file(address, username), {'auth': auth, 'expires': expires})
+
+    def delete(self, address, username):
+        try:
+            os.remove(self._token_file(address, username))
+        except OSError:
+            pass
+
+
+class LookupCache():
+    """Caches resolved objects by (collection, configuration, natural key).
+
+    Entries are kept in an in-memory LRU and, if a cache directory is given,
+    in one file per entry below <cache_dir>/<collection>/ which expires after
+    ttl seconds. Writes to a collection drop all of its entries."""
+
+    def __init__(self, cache_dir=None, ttl=300, size=LOOKUP_CACHE_SIZE):
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir else None
+        self.ttl = ttl
+        self.size = size
+        self.entries = OrderedDict()
+        # bulk modules write from several threads
+        self.lock = threading.Lock()
+
+    def _entry_file(self, key):
+        name = hashlib.sha256(json.dumps(key[1:]).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key[0], name)
+
+    def _remember(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._entry_file(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('expires', 0) < time.time():
+            return None
+        self._remember(key, entry['value'])
+        return entry['value']
+
+    def set(self, key, value):
+        self._remember(key, value)
+        if self.cache_dir is None:
+            return
+        entry_file = self._entry_file(key)
+        try:
+            os.makedirs(os.path.dirname(entry_file), mode=0o700, exist_ok=True)
+            write_json_atomic(entry_file, {'expires': time.time() + self.ttl, 'value': value})
+        except OSError:
+            # another fork invalidated the collection meanwhile, the entry
+            # is simply not cached on disk
+            pass
+
+    def invalidate(self, collection):
+        with self.lock:
+            for key in [x for x in self.entries if x[0] == collection]:
+                del self.entries[key]
+        if self.cache_dir is not None and collection:
+            shutil.rmtree(os.path.join(self.cache_dir, collection), ignore_errors=True)
+
+
+def parse_bam_datetime(value):
+    if not value:
+        return None
+    return datetime.datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def contained_collections(collection):
+    """Returns the collections whose objects are deleted along with an object
+    of collection, directly or inside the objects deleted with it."""
+    result = []
+    pending = list(CONTAINED_COLLECTIONS.get(collection, []))
+    while pending:
+        contained = pending.pop(0)
+        if contained not in result:
+            result.append(contained)
+            pending += CONTAINED_COLLECTIONS.get(contained, [])
+    return result
+
+
+def path_collection(url):
+    # '/views/1/zones' -> 'zones', '/resourceRecords/7' -> 'resourceRecords'
+    segments = [x for x in url.split('?')[0].split('/') if x and not x.isdigit()]
+    if not segments:
+        return None
+    return segments[-1]
+
+
+def error_status(exc):
+    # the HTTP status of a BAM error, from either the bluecat_libraries
+    # client or the ConnectionError of the httpapi connection; responses
+    # without a JSON body, e.g. error pages of a proxy, only carry the status
+    # in the raw response
+    status = getattr(exc, 'status', None) or getattr(exc, 'code', None)
+    if not isinstance(status, int):
+        status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def transient_error(exc):
+    """Classifies a failed request: 'unsent' if it never reached BAM or BAM
+    refused it without processing it (429, 503), so any method may be sent
+    again; 'transient' if repeating it may succeed but it may also have been
+    processed (502, 504, timeouts, dropped connections); otherwise None."""
+    status = error_status(exc)
+    if status in (429, 503):
+        return 'unsent'
+    if status in (502, 504):
+        return 'transient'
+    if status is not None:
+        return None
+    cause = exc.__cause__ if isinstance(exc, GeneralError) else exc
+    if isinstance(cause, requests.exceptions.ConnectTimeout):
+        return 'unsent'
+    if isinstance(cause, requests.exceptions.ConnectionError):
+        reason = getattr(cause.args[0], 'reason', None) if cause.args else None
+        return 'unsent' if isinstance(reason, NewConnectionError) else 'transient'
+    if isinstance(cause, requests.exceptions.Timeout):
+        return 'transient'
+    return None
+
+
+def retry_after(exc):
+    # seconds of the Retry-After header of an error response, if any
+    response = getattr(exc, 'response', None)
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def in_filters(field, values, max_length=FILTER_MAX_LENGTH):
+    """Yields filters like 'field:in("a", "b")' which together cover all
+    values, each one short enough to be sent in a single request."""
+    chunk = []
+    length = 0
+    for value in values:
+        value = str(value) if isinstance(value, int) else '"{}"'.format(value)
+        if chunk and length + len(value) + 2 > max_length:
+            yield '{}:in({})'.format(field, ', '.join(chunk))
+            chunk = []
+            length = 0
+        chunk.append(value)
+        length += len(value) + 2
+    if chunk:
+        yield '{}:in({})'.format(field, ', '.join(chunk))
+
+
+def host_record_data(name, reverse_record, addresses, address_ids=None, ttl=None):
+    """Returns the payload of a HostRecord. Addresses found in address_ids,
+    see Resolver.get_address_ids, are linked by ID, the others by value so
+    BAM creates them."""
+    data = dict()
+    data['name'] = name
+    data['type'] = 'HostRecord'
+    if ttl is not None:
+        data['ttl'] = ttl
+    data['reverseRecord'] = reverse_record
+    data_addresses = []
+    for address in addresses or []:
+        data_type = 'IPv6Address'
+        if ipaddress.ip_address(address).version == 4:
+            data_type = 'IPv4Address'
+        data_id = (address_ids or {}).get(str(ipaddress.ip_address(address)))
+        if data_id:
+            data_addresses.append({'type': data_type, 'id': data_id})
+        else:
+            data_addresses.append({'type': data_type, 'address': address})
+    data['addresses'] = data_addresses
+    return data
+
+
+def paginate(client, url, params=None, page_size=PAGE_SIZE, concurrency=1):
+    """Yields all objects of a collection, requesting page_size objects at a
+    time, so only one page is held in memory besides what the caller keeps.
+
+    With a concurrency above 1, up to that many of the following pages are
+    fetched in parallel while the objects are still yielded in order. The
+    offsets to fetch are taken from the totalCount of the first page if BAM
+    returns one, otherwise pages are requested ahead until a short page marks
+    the end of the collection."""
+    params = dict(params or {})
+    concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+
+    def fetch(offset, **extra):
+        response = client.http_get(url, params=dict(params, limit=page_size, offset=offset, **extra))
+        return response, response['data'] if response['count'] > 0 else []
+
+    # only the first page asks BAM to count the whole collection
+    response, data = fetch(0, total='true')
+    yield from data
+    if len(data) < page_size:
+        return
+    total = response.get('totalCount')
+    if total is None:
+        offsets = itertools.count(page_size, page_size)
+    else:
+        offsets = iter(range(page_size, total, page_size))
+
+    if concurrency == 1:
+        for offset in offsets:
+            response, data = fetch(offset)
+            yield from data
+            if len(data) < page_size:
+                return
+        return
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque(executor.submit(fetch, x) for x in itertools.islice(offsets, concurrency))
+        try:
+            while pending:
+                response, data = pending.popleft().result()
+                yield from data
+                if len(data) < page_size:
+                    return
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.append(executor.submit(fetch, offset))
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def run_concurrently(func, items, concurrency=1):
+    """Calls func for every item with at most concurrency calls in flight and
+    returns the results in the order of items."""
+    concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+    if concurrency == 1:
+        return [func(x) for x in items]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(func, items))
+
+
+def imap_concurrently(func, items, concurrency=1):
+    """Like run_concurrently, but yields the results in the order of items
+    while at most concurrency of them are pending, so large results can be
+    consumed one by one."""
+    concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+    items = iter(items)
+    if concurrency == 1:
+        for item in items:
+            yield func(item)
+        return
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque(executor.submit(func, x) for x in itertools.islice(items, concurrency))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                item = next(items, None)
+                if item is not None:
+                    pending.append(executor.submit(func, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def stream_concurrently(func, items, concurrency=1, chunk_size=PAGE_SIZE):
+    """Reads the iterables func returns for items, at most concurrency of
+    them at a time, and yields (item, objects) with lists of up to chunk_size
+    of their objects as they arrive. The lists of different items are
+    interleaved. Readers wait while concurrency lists are not consumed yet,
+    so only a few pages are held in memory instead of whole results."""
+    concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+
+    def chunked(item):
+        objects = iter(func(item))
+        while True:
+            chunk = list(itertools.islice(objects, chunk_size))
+            if not chunk:
+                return
+            yield item, chunk
+
+    if concurrency == 1:
+        for item in items:
+            yield from chunked(item)
+        return
+
+    items = list(items)
+    chunks = queue.Queue(maxsize=concurrency)
+    stop = threading.Event()
+    done = object()
+
+    def read(item):
+        try:
+            for entry in chunked(item):
+                if stop.is_set():
+                    return
+                chunks.put(entry)
+        except Exception as e:
+            chunks.put((done, e))
+        else:
+            chunks.put((done, None))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(read, x) for x in items]
+        try:
+            remaining = len(items)
+            while remaining:
+                item, chunk = chunks.get()
+                if item is done:
+                    remaining -= 1
+                    if chunk is not None:
+                        raise chunk
+                    continue
+                yield item, chunk
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
+            # readers still waiting for room in the queue
+            while not all(x.done() for x in futures):
+                try:
+                    chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+
+class ConnectionClient():
+    """Sends the requests of a module through the persistent connection of
+    the local.bluecat.bam httpapi plugin instead of its own session."""
+
+    def __init__(self, socket_path):
+        self.connection = Connection(socket_path)
+
+    def http_request(self, method, url, params=None, data=None, headers=None, cache=False, **kwargs):
+        return self.connection.send_request(method, url, params=params, data=data,
+                                            headers=headers, cache=cache)
+
+    def http_get(self, url, params=None, **kwargs):
+        return self.http_request('GET', url, params=params, **kwargs)
+
+    def http_post(self, url, params=None, data=None, **kwargs):
+        return self.http_request('POST', url, params=params, data=data, **kwargs)
+
+    def http_put(self, url, params=None, data=None, **kwargs):
+        return self.http_request('PUT', url, params=params, data=data, **kwargs)
+
+    def http_patch(self, url, params=None, data=None, **kwargs):
+        return self.http_request('PATCH', url, params=params, data=data, **kwargs)
+
+    def http_delete(self, url, params=None, **kwargs):
+        return self.http_request('DELETE', url, params=params, **kwargs)
+
+
+class BluecatClient():
+    """Wraps either the bluecat_libraries client or a ConnectionClient. Every
+    write drops the cached lookups of the collection it touches.
+
+    Requests failing with a transient error are repeated up to retries times
+    with exponential backoff and full jitter. A Retry-After of the response is
+    waited for, unless it is longer than backoff_max. POST requests are only
+    repeated if they surely were not processed.
+
+    With a Throttle every attempt waits for its rate and in-flight limits.
+    With RequestStats every request is recorded once it succeeded or failed
+    for good. The collections requested and written are kept in collections
+    and written, those whose objects went with a deleted container in
+    cascaded.
+
+    With memo, GET responses are kept by path and parameters for the life
+    of the client and dropped on any write to their collection, so repeated
+    lookups within a module run are sent once. Concurrent identical GETs
+    wait for the one in flight."""
+
+    def __init__(self, transport, lookup_cache=None, retries=RETRIES, backoff_max=BACKOFF_MAX, throttle=None,
+                 stats=None, memo=False):
+        self.transport = transport
+        self.lookup_cache = lookup_cache
+        self.retries = retries
+        self.backoff_max = backoff_max
+        self.throttle = throttle
+        self.stats = stats
+        self.collections = set()
+        self.written = set()
+        self.cascaded = set()
+        self.memo = dict() if memo else None
+        self.memo_lock = threading.Lock()
+        # the last raw response of each thread, for the status and sizes
+        self.local = threading.local()
+        session = getattr(transport, 'session', None)
+        if stats is not None and session is not None:
+            session.hooks['response'].append(self._keep_response)
+
+    def _keep_response(self, response, *args, **kwargs):
+        self.local.response = response
+        responses = getattr(self.local, 'responses', None)
+        if responses is not None:
+            responses.append(response)
+
+    def _send(self, method, url, **kwargs):
+        collection = path_collection(url)
+        if collection:
+            self.collections.add(collection)
+            if method != 'get':
+                self.written.add(collection)
+        if method == 'get':
+            return self._attempt(method, url, **kwargs)
+        invalid = [collection]
+        if method == 'delete':
+            invalid += contained_collections(collection)
+            self.cascaded.update(contained_collections(collection))
+        self._invalidate(invalid)
+        try:
+            return self._attempt(method, url, **kwargs)
+        finally:
+            # other forks and threads may have cached the old state while
+            # the write was sent
+            self._invalidate(invalid)
+
+    def _invalidate(self, collections):
+        if self.lookup_cache is not None:
+            for collection in collections:
+                self.lookup_cache.invalidate(collection)
+        if self.memo is not None:
+            with self.memo_lock:
+                for key in [x for x, y in self.memo.items() if y[0] in collections]:
+                    del self.memo[key]
+
+    def _attempt(self, method, url, **kwargs):
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            self.local.response = None
+            try:
+                result = self._request(method, url, **kwargs)
+            except Exception as e:
+                delay = self.retry_delay(method, e, attempt)
+                if delay is None:
+                    self.record(method, url, kwargs, started, attempt, error_status(e), None)
+                    raise
+            else:
+                self.record(method, url, kwargs, started, attempt, None, result)
+                return result
+            time.sleep(delay)
+            attempt += 1
+
+    def record(self, method, url, kwargs, started, retries, status, result):
+        if self.stats is None:
+            return
+        response = self.local.response
+        if response is not None:
+            status = response.status_code
+            request_bytes = payload_size(response.request.body)
+            response_bytes = len(response.content or b'')
+        else:
+            # the httpapi connection and snapshots only return parsed data
+            request_bytes = payload_size(kwargs.get('data'))
+            response_bytes = payload_size(result)
+        self.stats.record(method, url, status, time.monotonic() - started, request_bytes, response_bytes, retries)
+
+    def _request(self, method, url, **kwargs):
+        if self.throttle is None:
+            return getattr(self.transport, 'http_' + method)(url, **kwargs)
+        with self.throttle.slot():
+            return getattr(self.transport, 'http_' + method)(url, **kwargs)
+
+    def retry_delay(self, method, exc, attempt):
+        """Returns the seconds to wait before repeating a failed request, or
+        None if it must not be repeated."""
+        if attempt >= self.retries:
+            return None
+        kind = transient_error(exc)
+        if kind is None or (method == 'post' and kind != 'unsent'):
+            return None
+        delay = random.uniform(0, min(self.backoff_max, RETRY_BACKOFF_BASE * 2 ** attempt))
+        wait = retry_after(exc)
+        if wait is not None:
+            if wait > self.backoff_max:
+                return None
+            delay = max(delay, wait)
+        return delay
+
+    def _get(self, url, params, memo=True, **kwargs):
+        if self.memo is None or not memo:
+            return self._send('get', url, params=params, **kwargs)
+        key = (url, json.dumps(params, sort_keys=True, default=str))
+        with self.memo_lock:
+            entry = self.memo.get(key)
+            if entry is None:
+                future = Future()
+                self.memo[key] = (path_collection(url), future)
+        if entry is not None:
+            # callers may change what they get
+            return copy.deepcopy(entry[1].result())
+        try:
+            result = self._send('get', url, params=params, **kwargs)
+        except Exception as e:
+            with self.memo_lock:
+                if self.memo.get(key, (None, None))[1] is future:
+                    del self.memo[key]
+            future.set_exception(e)
+            raise
+        keep = not isinstance(result, dict) or len(result.get('data') or []) <= MEMO_MAX_OBJECTS
+        future.set_result(copy.deepcopy(result) if keep else result)
+        if not keep:
+            with self.memo_lock:
+                if self.memo.get(key, (None, None))[1] is future:
+                    del self.memo[key]
+        return result
+
+    def lookup(self, url, params):
+        # lookups are cached for the whole play by the httpapi connection
+        if isinstance(self.transport, ConnectionClient):
+            return self._get(url, params, cache=True)
+        return self._get(url, params)
+
+    def http_get(self, url, params=None, **kwargs):
+        """GETs url; memo=False bypasses the request memo, for resources
+        changing without a write of the module like deployment states."""
+        return self._get(url, params, **kwargs)
+
+    def http_post(self, url, params=None, data=None, **kwargs):
+        return self._send('post', url, params=params, data=data, **kwargs)
+
+    def http_put(self, url, params=None, data=None, **kwargs):
+        return self._send('put', url, params=params, data=data, **kwargs)
+
+    def http_patch(self, url, params=None, data=None, **kwargs):
+        return self._send('patch', url, params=params, data=data, **kwargs)
+
+    def http_delete(self, url, params=None, **kwargs):
+        return self._send('delete', url, params=params, **kwargs)
+
+    def _session_request(self, func, *args):
+        # the transport sends the session requests itself, login even two of
+        # them, so every response it receives meanwhile is recorded
+        self.local.responses = []
+        try:
+            return func(*args)
+        finally:
+            responses, self.local.responses = self.local.responses, None
+            if self.stats is not None:
+                for response in responses:
+                    self.stats.record(response.request.method, response.request.path_url.split(API_PATH, 1)[-1],
+                                      response.status_code, response.elapsed.total_seconds(),
+                                      payload_size(response.request.body), len(response.content or b''), 0)
+
+    def login(self, username, password):
+        return self._session_request(self.transport.login, username, password)
+
+    def authenticate(self, auth):
+        """Uses the session of the Authorization header auth, which the
+        transport validates against /sessions/current."""
+        self._session_request(setattr, self.transport, 'auth', auth)
 
     def logout(self):
-        self.client.logout()
+        return self._session_request(self.transport.logout)
 
-    def exec_module(self):
-        self.fail_json(msg='Override in sub-module. Called from: {}'.format(self.__class__.__name__))
 
-    def fail_json(self, msg, **kwargs):
-        self.logout()
-        self.module.fail_json(msg=msg, **kwargs)
+def login_client(address, username, password, token_store=None, lookup_cache=None, verify=True, **kwargs):
+    """Returns a BluecatClient with a session to address. With a TokenStore
+    a stored session token is reused and a new one is stored. Further
+    keyword arguments are passed to BluecatClient."""
+    client = BluecatClient(Client(address, verify=verify), lookup_cache, **kwargs)
+    if token_store is not None:
+        auth = token_store.get(address, username)
+        if auth:
+            try:
+                client.authenticate(auth)
+                return client
+            except BAMV2ErrorResponse:
+                token_store.delete(address, username)
+    session = client.login(username, password)
+    if token_store is not None:
+        token_store.put(address, username, client.transport.auth,
+                        parse_bam_datetime(session.get('apiTokenExpirationDateTime')))
+    return client
 
-    def exit_json(self, **kwargs):
-        self.logout()
-        self.module.exit_json(**kwargs)
+
+def lookup_cache_dir(cache_dir, address):
+    # keep the entries of different Address Managers apart
+    if not cache_dir:
+        return None
+    server = hashlib.sha256(str(address).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, server)
+
+
+def build_throttle(throttle_dir, address, max_rps=None, max_inflight=None):
+    """Returns the Throttle shared by all processes talking to address, or
+    None without limits."""
+    if not max_rps and not max_inflight:
+        return None
+    return Throttle(lookup_cache_dir(throttle_dir, address), max_rps, max_inflight)
+
+
+class Resolver():
+    """Name to object lookups shared by all modules. Needs self.client to be
+    a BluecatClient and self.lookup_cache to be a LookupCache.
+
+    The get_*s and get_*s_by_* methods look up a list of names at once and
+    return a dict keyed by the names found, see _get_many."""
+
+    def __init__(self, client, lookup_cache=None):
+        self.client = client
+        self.lookup_cache = lookup_cache or LookupCache()
+        self.containment_indexes = dict()
+
+    def _get_first(self, collection, configuration, key, url, filter):
+        cache_key = (collection, configuration, key)
+        obj = self.lookup_cache.get(cache_key)
+        if obj is not None:
+            self.client.collections.add(collection)
+            return obj
+        response = self.client.lookup(url, params={'limit': 1,
+                                                   'filter': filter
+                                                   }
+                                      )
+        if response['count'] == 0:
+            return None
+        obj = response['data'][0]
+        self.lookup_cache.set(cache_key, obj)
+        return obj
+
+    def _get_many(self, collection, configuration, values, url, field, filter=None, key=None):
+        """Batch version of _get_first: returns {value: object} for the values
+        found in field. Cached values are taken from the lookup cache, the
+        others are queried with as few field:in() filters as possible and
+        cached under the same keys _get_first uses. key maps a value to the
+        cache key if it is not the value itself."""
+        key = key or (lambda x: x)
+        result = dict()
+        missing = dict()
+        for value in values:
+            obj = self.lookup_cache.get((collection, configuration, key(value)))
+            if obj is not None:
+                self.client.collections.add(collection)
+                result[value] = obj
+            else:
+                missing.setdefault(index_value(field, value), []).append(value)
+        for in_filter in in_filters(field, sorted(set(x[0] for x in missing.values()))):
+            query = in_filter if filter is None else '{} and {}'.format(filter, in_filter)
+            for obj in paginate(self.client, url, {'filter': query}):
+                for value in missing.get(index_value(field, obj.get(field)), []):
+                    self.lookup_cache.set((collection, configuration, key(value)), obj)
+                    result[value] = obj
+        return result
+
+    def get_by_field(self, collection, configuration, field, values, view=None):
+        """Looks up objects of any collection by the values of one field and
+        returns {value: object} for those found. With a configuration only its
+        objects are searched, with a view only the objects of that view. The
+        cache entries are shared with the get_* methods of the collection."""
+        filters = []
+        if configuration is not None:
+            filters.append('configuration.name:eq("{}")'.format(configuration))
+        if view is not None:
+            filters.append('view.name:eq("{}")'.format(view))
+        key = None
+        if collection in ('zones', 'resourceRecords'):
+            # the same name can exist in several views
+            key = lambda x: (view, x)
+        return self._get_many(collection, configuration, values, f'/{collection}', field,
+                              ' and '.join(filters) or None, key)
+
+    def get_addresses(self, configuration, addresses):
+        """Returns the existing address objects of a configuration for a list
+        of IP addresses, keyed by the normalized address."""
+        result = dict()
+        addresses = sorted(set(str(ipaddress.ip_address(x)) for x in addresses))
+        for address_filter in in_filters('address', addresses):
+            filter = 'configuration.name:eq("{}") and {}'.format(configuration, address_filter)
+            for address in paginate(self.client, '/addresses', {'filter': filter}):
+                result[str(ipaddress.ip_address(address['address']))] = address
+        return result
+
+    def get_address_ids(self, configuration, addresses):
+        """Returns {normalized address: ID} of the existing addresses of a
+        configuration among a list of IP addresses, for host_record_data."""
+        if not addresses:
+            return dict()
+        return {x: y['id'] for x, y in self.get_addresses(configuration, addresses).items()}
+
+    def _get_ranges(self, collection, configuration):
+        key = (collection, configuration, '*')
+        ranges = self.lookup_cache.get(key)
+        if ranges is None:
+            filter = 'configuration.name:eq("{}")'.format(configuration)
+            ranges = [{'id': x['id'], 'type': x['type'], 'range': x['range']}
+                      for x in paginate(self.client, f'/{collection}', {'filter': filter,
+                                                                         'fields': 'id,type,range'})]
+            self.lookup_cache.set(key, ranges)
+        return ranges
+
+    def get_containment_index(self, configuration, collections=('blocks', 'networks'), build=False):
+        """Returns the ContainmentIndex of the blocks and/or networks of a
+        configuration. As building it takes one sweep over each collection,
+        it is only built if asked to or if the on-disk cache keeps it for the
+        following tasks; otherwise None is returned. Callers only ask for the
+        collection they look up, so creating networks does not drop the index
+        the next network task finds its block in."""
+        collections = tuple(collections)
+        cold = any(self.lookup_cache.get((x, configuration, '*')) is None for x in collections)
+        if cold and not (build or self.lookup_cache.cache_dir):
+            return None
+        ranges = [self._get_ranges(x, configuration) for x in collections]
+        key = (configuration, collections)
+        cached = self.containment_indexes.get(key)
+        # writes to blocks or networks drop the cached ranges and with them the index
+        if cached is None or any(x is not y for x, y in zip(cached[0], ranges)):
+            cached = (ranges, ContainmentIndex([y for x in ranges for y in x]))
+            self.containment_indexes[key] = cached
+        return cached[1]
+
+    def add_range(self, collection, configuration, obj):
+        """Puts a block or network created by this task back into the ranges
+        cached for the index of its collection, which the create dropped, so
+        the next task does not sweep the collection again."""
+        cached = self.containment_indexes.get((configuration, (collection,)))
+        if cached is None or not isinstance(obj, dict) or 'range' not in obj:
+            return
+        ranges = cached[0][0] + [{'id': obj['id'], 'type': obj['type'], 'range': obj['range']}]
+        self.lookup_cache.set((collection, configuration, '*'), ranges)
 
     def get_administrative_access_right(self, userscope_id):
         filter = 'type:eq("{}") and userScope.id:eq({})'.format('AdministrativeAccessRight', userscope_id)
-        access_rights = self.client.http_get('/accessRights',
-                                             params={'limit': 10000,
-                                                     'filter': filter
-                                                     }
-                                             )
+        access_rights = self.client.lookup('/accessRights',
+                                           params={'limit': 10000,
+                                                   'filter': filter
+                                                   }
+                                           )
         if access_rights['count'] == 0:
             return None
         else:
@@ -72,11 +850,11 @@ class BluecatModule():
         # even though we should filter in a way that only returns one resource
         # to begin with, we have to set a pretty high limit, otherwise we don't
         # get a return value
-        access_rights = self.client.http_get('/accessRights',
-                                             params={'limit': 10000,
-                                                     'filter': filter
-                                                     }
-                                             )
+        access_rights = self.client.lookup('/accessRights',
+                                           params={'limit': 10000,
+                                                   'filter': filter
+                                                   }
+                                           )
         if access_rights['count'] == 0:
             return None
         else:
@@ -84,150 +862,297 @@ class BluecatModule():
 
     def get_authenticator_by_name(self, name):
         filter = 'name:eq("{}")'.format(name)
-        authenticators = self.client.http_get('/authenticators',
-                                              params={'limit': 1,
-                                                      'filter': filter
-                                                      }
-                                              )
-
-        if authenticators['count'] == 0:
-            return None
-        else:
-            return authenticators['data'][0]
+        return self._get_first('authenticators', None, name, '/authenticators', filter)
 
     def get_block_by_range(self, configuration, range):
         filter = 'configuration.name:eq("{}") and range:eq("{}")'.format(configuration, range)
-        blocks = self.client.http_get('/blocks',
-                                       params={'limit': 1,
-                                               'filter': filter
-                                              }
-                                       )
-        if blocks['count'] == 0:
-            return None
-        else:
-            return blocks['data'][0]
+        return self._get_first('blocks', configuration, range, '/blocks', filter)
+
+    def get_blocks_by_range(self, configuration, ranges):
+        filter = 'configuration.name:eq("{}")'.format(configuration)
+        return self._get_many('blocks', configuration, ranges, '/blocks', 'range', filter)
 
     def get_configuration_by_name(self, name):
         filter = f'name:eq("{name}")'
-        configurations = self.client.http_get('/configurations',
-                                              params={'limit': 1,
-                                                      'filter': filter
-                                                      }
-                                              )
-        if configurations['count'] == 0:
-            return None
-        else:
-            return configurations['data'][0]
+        return self._get_first('configurations', None, name, '/configurations', filter)
 
+    def get_interface_by_name(self, configuration, name):
+        filter = 'configuration.name:eq("{}") and name:eq("{}")'.format(configuration, name)
+        return self._get_first('interfaces', configuration, name, '/interfaces', filter)
 
     def get_network_by_range(self, configuration, range):
         filter = 'configuration.name:eq("{}") and range:eq("{}")'.format(configuration, range)
-        networks = self.client.http_get('/networks',
-                                        params={'limit': 1,
-                                                'filter': filter
-                                               }
-                                        )
-        if networks['count'] == 0:
-            return None
-        else:
-            return networks['data'][0]
+        return self._get_first('networks', configuration, range, '/networks', filter)
+
+    def get_networks_by_range(self, configuration, ranges):
+        filter = 'configuration.name:eq("{}")'.format(configuration)
+        return self._get_many('networks', configuration, ranges, '/networks', 'range', filter)
+
+    def get_server_by_name(self, configuration, name):
+        filter = 'configuration.name:eq("{}") and name:eq("{}")'.format(configuration, name)
+        return self._get_first('servers', configuration, name, '/servers', filter)
 
-    def get_zone_by_fqdn(self, configuration, fqdn):
+    def get_servers_by_name(self, configuration, names):
+        filter = 'configuration.name:eq("{}")'.format(configuration)
+        return self._get_many('servers', configuration, names, '/servers', 'name', filter)
+
+    def get_zone_by_fqdn(self, configuration, fqdn, view=None):
         filter = 'configuration.name:eq("{}") and absoluteName:eq("{}")'.format(configuration, fqdn)
-        zones = self.client.http_get('/zones',
-                                     params={'limit': 1,
-                                             'filter': filter
-                                            }
-                                     )
-        if zones['count'] == 0:
-            return None
-        else:
-            return zones['data'][0]
+        if view is not None:
+            filter = 'configuration.name:eq("{}") and view.name:eq("{}") and absoluteName:eq("{}")'.format(
+                configuration, view, fqdn)
+        return self._get_first('zones', configuration, (view, fqdn), '/zones', filter)
+
+    def get_zones_by_fqdn(self, configuration, fqdns, view=None):
+        filter = 'configuration.name:eq("{}")'.format(configuration)
+        if view is not None:
+            filter = '{} and view.name:eq("{}")'.format(filter, view)
+        return self._get_many('zones', configuration, fqdns, '/zones', 'absoluteName', filter,
+                              key=lambda x: (view, x))
 
     def get_tag(self, name):
         filter = 'name:eq("{}")'.format(name)
-        rr = self.client.http_get(f'/tags',
-                                  params={'limit': 1,
-                                          'filter': filter
-                                          }
-                                  )
-        if rr['count'] == 0:
-            return None
-        else:
-            return rr['data'][0]
+        return self._get_first('tags', None, name, '/tags', filter)
+
+    def get_tags(self, names):
+        return self._get_many('tags', None, names, '/tags', 'name')
 
-    def get_tag_in_tag(self, name, parent):
+    def get_tag_in_tag(self, name, parent_id):
         filter = 'name:eq("{}")'.format(name)
-        parent
-        rr = self.client.http_get(f'/tags/{parent_id}/tags',
-                                  params={'limit': 1,
-                                          'filter': filter
-                                          }
-                                  )
-        if rr['count'] == 0:
-            return None
-        else:
-            return rr['data'][0]
+        return self._get_first('tags', None, (parent_id, name), f'/tags/{parent_id}/tags', filter)
 
-    def get_tag_in_tag_group(self, name, parent):
+    def get_tag_in_tag_group(self, name, parent_id):
         filter = 'name:eq("{}")'.format(name)
-        rr = self.client.http_get(f'/tagGroups/{parent_id}/tags',
-                                  params={'limit': 1,
-                                          'filter': filter
-                                          }
-                                  )
-        if rr['count'] == 0:
-            return None
-        else:
-            return rr['data'][0]
+        return self._get_first('tags', None, ('tagGroups', parent_id, name), f'/tagGroups/{parent_id}/tags', filter)
+
+    def get_tag_groups(self, names):
+        return self._get_many('tagGroups', None, names, '/tagGroups', 'name')
 
     def get_tag_group(self, name):
         filter = 'name:eq("{}")'.format(name)
-        rr = self.client.http_get(f'/tagGroups',
-                                  params={'limit': 1,
-                                          'filter': filter
-                                          }
-                                  )
-        if rr['count'] == 0:
-            return None
-        else:
-            return rr['data'][0]
+        return self._get_first('tagGroups', None, name, '/tagGroups', filter)
 
     def get_group_by_name(self, name):
         filter = 'name:eq("{}")'.format(name)
-        groups = self.client.http_get(f'/groups',
-                                      params={'limit': 1,
-                                              'filter': filter
-                                              }
-                                      )
+        return self._get_first('groups', None, name, '/groups', filter)
 
-        if groups['count'] == 0:
-            return None
-        else:
-            return groups['data'][0]
+    def get_groups_by_name(self, names):
+        return self._get_many('groups', None, names, '/groups', 'name')
 
     def get_user_by_name(self, name):
         filter = 'name:eq("{}")'.format(name)
-        users = self.client.http_get(f'/users',
-                                     params={'limit': 1,
-                                             'filter': filter
-                                             }
-                                     )
+        return self._get_first('users', None, name, '/users', filter)
 
-        if users['count'] == 0:
-            return None
-        else:
-            return users['data'][0]
+    def get_users_by_name(self, names):
+        return self._get_many('users', None, names, '/users', 'name')
+
+    def get_user_defined_link_definition(self, display_name):
+        filter = 'displayName:eq("{}")'.format(display_name)
+        return self._get_first('userDefinedLinkDefinitions', None, display_name,
+                               '/userDefinedLinkDefinitions', filter)
 
     def get_view_by_name(self, configuration, name):
         filter = (f'configuration.name:eq("{configuration}") and '
                   f'name:eq("{name}")')
-        views = self.client.http_get('/views',
-                                      params={'limit': 1,
-                                              'filter': filter
-                                             }
-                                      )
-        if views['count'] == 0:
+        return self._get_first('views', configuration, name, '/views', filter)
+
+
+class BluecatModule(Resolver):
+    # services whose deployment a change made by the module makes pending
+    deployment_services = ()
+    # parameters naming the object the module manages, for bc_applied_cache
+    applied_key = ()
+
+    def __init__(self, module_args, required_if=None, bypass_checks=False,
+                 no_log=False, mutually_exclusive=None, required_together=None,
+                 required_one_of=None, add_file_common_args=False,
+                 supports_check_mode=False, is_fact=False):
+
+        argument_spec = dict(bc_address=dict(type='str'),
+                             bc_api_username=dict(type='str'),
+                             bc_api_password=dict(type='str', no_log=True),
+                             bc_session_reuse=dict(type='bool', default=False),
+                             bc_token_store=dict(type='path', default='~/.ansible/bluecat/tokens'),
+                             bc_cache_dir=dict(type='path'),
+                             bc_cache_ttl=dict(type='int', default=300),
+                             bc_retries=dict(type='int', default=RETRIES),
+                             bc_backoff_max=dict(type='float', default=BACKOFF_MAX),
+                             bc_max_rps=dict(type='float'),
+                             bc_max_inflight=dict(type='int'),
+                             bc_throttle_dir=dict(type='path', default='~/.ansible/bluecat/throttle'),
+                             bc_stats=dict(type='bool', default=False),
+                             bc_coalesce_deployments=dict(type='bool', default=False),
+                             bc_deployment_dir=dict(type='path', default='~/.ansible/bluecat/deployments'),
+                             bc_applied_cache=dict(type='bool', default=False),
+                             bc_applied_dir=dict(type='path', default='~/.ansible/bluecat/applied'),
+                             bc_applied_ttl=dict(type='int', default=86400),
+                             bc_applied_verify=dict(type='float', default=0.05)
+                             )
+        if is_fact:
+            fact_argument_spec = dict(
+                filter=dict(required=True, type='str'),
+                fields=dict(type='str'),
+                limit=dict(type='int', default=100),
+                all=dict(type='bool', default=False),
+                page_size=dict(type='int', default=PAGE_SIZE),
+                concurrency=dict(type='int', default=1),
+                source=dict(type='str', default='api', choices=['api', 'snapshot']),
+                snapshot=dict(type='path')
+            )
+            argument_spec.update(fact_argument_spec)
+        argument_spec.update(module_args)
+        if is_fact:
+            required_if = (required_if or []) + [('source', 'snapshot', ['snapshot'])]
+        self.module = AnsibleModule(argument_spec=argument_spec,
+                                    required_if=required_if,
+                                    bypass_checks=bypass_checks,
+                                    no_log=no_log,
+                                    mutually_exclusive=mutually_exclusive,
+                                    required_together=required_together,
+                                    required_one_of=required_one_of,
+                                    add_file_common_args=add_file_common_args,
+                                    supports_check_mode=supports_check_mode)
+        self.check_mode = self.module.check_mode
+        self.headers = {"Content-Type": MediaType.JSON}
+        self.client = None
+        self.token_store = None
+        self.stats = None
+        if self.stats_requested() or os.environ.get('BC_TRACE_FILE'):
+            self.stats = RequestStats(os.environ.get('BC_TRACE_FILE'),
+                                      {'module': self.module._name, 'pid': os.getpid()})
+        self.lookup_cache = self.build_lookup_cache(self.module.params)
+        self.containment_indexes = dict()
+        self.deployment_markers = None
+        if self.module.params.get('bc_coalesce_deployments'):
+            self.deployment_markers = DeploymentMarkers(
+                lookup_cache_dir(self.module.params.get('bc_deployment_dir'), self.module.params.get('bc_address')))
+        self.applied_cache = self.build_applied_cache(self.module.params)
+        if self.applied_cache is not None:
+            # writes of other runs from now on invalidate what this run applies
+            self.applied_generations = self.applied_cache.generations()
+            if self.applied_requested() and self.applied_cache.hit(self.__class__.__name__, self.applied_values(),
+                                                                   params_digest(self.__class__.__name__,
+                                                                                 self.module.params)):
+                result = dict(changed=False, applied_cache_hit=True)
+                self.add_stats(result)
+                self.module.exit_json(**result)
+        self.login(self.module.params)
+        result = self.exec_module(**self.module.params)
+        self.exit_json(**result)
+
+    def build_lookup_cache(self, params):
+        cache_dir = lookup_cache_dir(params.get('bc_cache_dir'), params.get('bc_address'))
+        if params.get('source') == 'snapshot':
+            # snapshot answers must not end up in the cache of the live server
+            cache_dir = None
+        return LookupCache(cache_dir, params.get('bc_cache_ttl'))
+
+    def build_applied_cache(self, params):
+        if params.get('source') == 'snapshot':
             return None
-        else:
-            return views['data'][0]
+        applied_dir = lookup_cache_dir(params.get('bc_applied_dir'), params.get('bc_address'))
+        # once the cache is used, all modules count their writes, so changes
+        # by tasks without bc_applied_cache are seen as well
+        if params.get('bc_applied_cache') or os.path.isdir(applied_dir):
+            return AppliedCache(applied_dir, params.get('bc_applied_ttl'), params.get('bc_applied_verify'))
+        return None
+
+    def applied_requested(self):
+        return bool(self.applied_key) and self.module.params.get('bc_applied_cache') and not self.check_mode
+
+    def applied_values(self):
+        return [self.module.params.get(x) for x in self.applied_key]
+
+    def update_applied_cache(self, result, applied):
+        if self.applied_cache is None or self.client is None:
+            return
+        name = self.__class__.__name__
+        self.applied_cache.written(name, self.client.written, self.client.cascaded)
+        if applied and self.applied_requested():
+            self.applied_cache.applied(name, self.applied_values(), params_digest(name, self.module.params),
+                                       self.client.collections, self.applied_generations)
+
+    def login(self, params):
+        if params.get('source') == 'snapshot':
+            try:
+                self.client = BluecatClient(SnapshotClient(params.get('snapshot')), self.lookup_cache,
+                                            stats=self.stats, memo=True)
+            except SnapshotError as e:
+                self.module.fail_json(msg=str(e))
+            return
+        throttle = build_throttle(params.get('bc_throttle_dir'), params.get('bc_address'),
+                                  params.get('bc_max_rps'), params.get('bc_max_inflight'))
+        if self.module._socket_path:
+            # running through the local.bluecat.bam httpapi connection, which
+            # holds the session for the whole play
+            self.client = BluecatClient(ConnectionClient(self.module._socket_path), self.lookup_cache,
+                                        params.get('bc_retries'), params.get('bc_backoff_max'), throttle,
+                                        self.stats, memo=True)
+            return
+        if params.get('bc_session_reuse'):
+            self.token_store = TokenStore(params.get('bc_token_store'))
+        self.client = login_client(params.get('bc_address'), params.get('bc_api_username'),
+                                   params.get('bc_api_password'), self.token_store, self.lookup_cache,
+                                   retries=params.get('bc_retries'), backoff_max=params.get('bc_backoff_max'),
+                                   throttle=throttle, stats=self.stats, memo=True)
+
+    def logout(self):
+        # reused sessions stay open until their token expires
+        if self.token_store is None and isinstance(self.client.transport, Client):
+            self.client.logout()
+
+    def get_facts(self, url):
+        params = {'filter': self.module.params.get('filter'),
+                  'fields': self.module.params.get('fields')
+                  }
+        if self.module.params.get('all'):
+            return list(paginate(self.client, url, params, self.module.params.get('page_size'),
+                                 self.module.params.get('concurrency')))
+        params['limit'] = self.module.params.get('limit')
+        response = self.client.http_get(url, params=params)
+        if response['count'] == 0:
+            return []
+        return response['data']
+
+    def send_requests(self, requests, concurrency=1):
+        """Sends (method, url, data, headers) tuples, at most concurrency at a
+        time, and returns a (response, error message) tuple for each."""
+        def send(request):
+            method, url, data, headers = request
+            try:
+                return getattr(self.client, 'http_' + method.lower())(url, data=data, headers=headers), None
+            except Exception as e:
+                return None, str(e)
+
+        return run_concurrently(send, requests, concurrency)
+
+    def exec_module(self):
+        self.fail_json(msg='Override in sub-module. Called from: {}'.format(self.__class__.__name__))
+
+    def fail_json(self, msg, **kwargs):
+        self.logout()
+        self.mark_deployment(kwargs)
+        self.update_applied_cache(kwargs, False)
+        self.add_stats(kwargs)
+        self.module.fail_json(msg=msg, **kwargs)
+
+    def exit_json(self, **kwargs):
+        self.logout()
+        self.mark_deployment(kwargs)
+        self.update_applied_cache(kwargs, True)
+        self.add_stats(kwargs)
+        self.module.exit_json(**kwargs)
+
+    def stats_requested(self):
+        # BC_STATS is set by the local.bluecat.bam_profile callback
+        return self.module.params.get('bc_stats') or bool(os.environ.get('BC_STATS'))
+
+    def mark_deployment(self, result):
+        if self.deployment_markers is None or not self.deployment_services:
+            return
+        if result.get('changed') and not self.check_mode:
+            self.deployment_markers.mark(self.module.params.get('configuration'), self.deployment_services)
+
+    def add_stats(self, result):
+        if self.stats_requested() and self.stats is not None:
+            result['bc_stats'] = self.stats.summary()
@@ -9,6 +9,8 @@ import json
 from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
 
 class AccessRight(BluecatModule):
+    applied_key = ('type', 'userScope_name', 'userScope_type', 'resource', 'resource_type', 'configuration')
+
     def __init__(self):
         self.module_args = dict(
             state=dict(type='str', default='present', choices=['present', 'absent']),
@@ -37,7 +39,7 @@ class AccessRight(BluecatModule):
         ]
 
         super(AccessRight, self).__init__(self.module_args,
-                                          required_if=self.required_if
+                                          required_if=self.required_if,
                                           supports_check_mode=True)
 
     def exec_module(self, **kwargs):
@@ -181,6 +183,11 @@ class AccessRight(BluecatModule):
         for key, value in data.items():
             if key == 'userScope':
                 continue
+            # the API returns the resource with its type and name
+            if key == 'resource':
+                if value['id'] != (access_right.get(key) or {}).get('id'):
+                    return True
+                continue
             if value != access_right[key]:
                 return True
         return False
@@ -15,15 +15,7 @@ class AccessRightFacts(BluecatModule):
 
     def exec_module(self, **kwargs):
         results = dict(ansible_facts=dict(access_rights=[]))
-        response = self.client.http_get(f'/accessRights',
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            access_rights = response['data']
-            results['ansible_facts']['access_rights'] = access_rights
+        results['ansible_facts']['access_rights'] = self.get_facts(f'/accessRights')
         return results
 
 def main():
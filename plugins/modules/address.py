@@ -10,6 +10,8 @@ import ipaddress
 from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
 
 class Address(BluecatModule):
+    applied_key = ('configuration', 'address')
+
     def __init__(self):
         self.module_args = dict(
             state=dict(type='str', default='present', choices=['present', 'absent']),
@@ -53,6 +55,9 @@ class Address(BluecatModule):
         self.exit_json(changed=changed, result=str(result))
 
     def get_network_id(self):
+        index = self.get_containment_index(self.module.params.get('configuration'), ('networks',))
+        if index is not None:
+            return index.deepest(self.module.params.get('address'), 'networks')
         filter = 'configuration.name:eq("{}") and range:contains("{}")'.format(self.module.params.get('configuration'), self.module.params.get('address'))
         networks = self.client.http_get('/networks',
                                               params={'limit': 1,
@@ -65,6 +70,9 @@ class Address(BluecatModule):
             return networks['data'][0]['id']
 
     def find_network_id(self):
+        index = self.get_containment_index(self.module.params.get('configuration'), ('networks',))
+        if index is not None:
+            return index.deepest(self.module.params.get('address'), 'networks')
         filter = 'configuration.name:eq("{}") and range:contains("{}")'.format(self.module.params.get('configuration'), self.module.params.get('address'))
         networks = self.client.http_get('/networks',
                                               params={'limit': 1,
@@ -0,0 +1,135 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2026, Philipp Fromme <philipp.fromme@uni-paderborn.de>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+import json
+
+from ansible_collections.local.bluecat.plugins.module_utils.bc_ipindex import AddressSet, free_networks, ip_range
+from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule, PAGE_SIZE, error_status, paginate
+
+class AddressAllocate(BluecatModule):
+    def __init__(self):
+        self.module_args = dict(
+            configuration=dict(required=True, type='str'),
+            network=dict(type='str'),
+            block=dict(type='str'),
+            prefix_length=dict(type='int'),
+            count=dict(type='int', default=1),
+            name=dict(type='str'),
+            address_state=dict(type='str', default='STATIC', choices=['STATIC', 'RESERVED']),
+            retries=dict(type='int', default=10),
+            page_size=dict(type='int', default=PAGE_SIZE)
+        )
+        self.mutually_exclusive = [('network', 'block')]
+        self.required_one_of = [('network', 'block')]
+        self.required_together = [('block', 'prefix_length')]
+
+        super(AddressAllocate, self).__init__(self.module_args,
+                                              mutually_exclusive=self.mutually_exclusive,
+                                              required_one_of=self.required_one_of,
+                                              required_together=self.required_together,
+                                              supports_check_mode=True)
+
+    def exec_module(self, **kwargs):
+        if self.module.params.get('network'):
+            return self.allocate_addresses()
+        return self.allocate_networks()
+
+    def allocate_addresses(self):
+        range = self.module.params.get('network')
+        network = self.get_network_by_range(self.module.params.get('configuration'), range)
+        if network is None:
+            self.fail_json(msg='Could not find network {}!'.format(range))
+        if self.module.params.get('address_state') == 'RESERVED' and ip_range(range)[0] == 6:
+            self.fail_json(msg='IPv6 address cannot have state RESERVED')
+
+        # only the address of each listed object is kept, in a bitmap
+        used = AddressSet(network['range'])
+        existing = []
+        name = self.module.params.get('name')
+        for address in paginate(self.client, f'/networks/{network["id"]}/addresses',
+                                params={'fields': 'address,name'},
+                                page_size=self.module.params.get('page_size')):
+            used.add(address['address'])
+            if name and address.get('name') == name:
+                existing.append(address['address'])
+
+        allocated = self.reserve(used.free(), f'/networks/{network["id"]}/addresses', self.build_address_data, existing)
+        return dict(changed=bool(allocated), allocated=allocated, addresses=existing + allocated)
+
+    def allocate_networks(self):
+        range = self.module.params.get('block')
+        block = self.get_block_by_range(self.module.params.get('configuration'), range)
+        if block is None:
+            self.fail_json(msg='Could not find block {}!'.format(range))
+
+        # sub-blocks count as taken, networks are only allocated directly in the block
+        used = []
+        existing = []
+        name = self.module.params.get('name')
+        for collection in ('blocks', 'networks'):
+            for child in paginate(self.client, f'/blocks/{block["id"]}/{collection}',
+                                  params={'fields': 'range,name'},
+                                  page_size=self.module.params.get('page_size')):
+                used.append(ip_range(child['range'])[1:])
+                if collection == 'networks' and name and child.get('name') == name:
+                    existing.append(child['range'])
+
+        candidates = free_networks(block['range'], used, self.module.params.get('prefix_length'))
+        allocated = self.reserve(candidates, f'/blocks/{block["id"]}/networks', self.build_network_data, existing)
+        return dict(changed=bool(allocated), allocated=allocated, networks=existing + allocated)
+
+    def reserve(self, candidates, url, build_data, existing):
+        # objects already allocated under the same name count towards count
+        missing = self.module.params.get('count') - len(existing)
+        allocated = []
+        conflicts = 0
+        for candidate in candidates:
+            if len(allocated) >= missing:
+                break
+            if not self.module.check_mode:
+                try:
+                    self.client.http_post(url, data=build_data(candidate), headers=self.headers)
+                except Exception as e:
+                    # taken by someone else since the listing, try the next one
+                    if error_status(e) == 409 and conflicts < self.module.params.get('retries'):
+                        conflicts += 1
+                        continue
+                    self.fail_json(msg='Failed to allocate {}: {}'.format(candidate, e),
+                                   changed=bool(allocated), allocated=allocated)
+            allocated.append(str(candidate))
+        if len(allocated) < missing:
+            self.fail_json(msg='Only {} of {} free objects found in {}'.format(
+                               len(allocated), missing,
+                               self.module.params.get('network') or self.module.params.get('block')),
+                           changed=bool(allocated), allocated=allocated)
+        return allocated
+
+    def build_address_data(self, address):
+        data = dict()
+        data['address'] = str(address)
+        data['name'] = self.module.params.get('name')
+        data['state'] = self.module.params.get('address_state')
+        data['type'] = 'IPv6Address'
+        if address.version == 4:
+            data['type'] = 'IPv4Address'
+        data = json.dumps(data)
+        return data
+
+    def build_network_data(self, network):
+        data = dict()
+        data['name'] = self.module.params.get('name')
+        data['range'] = str(network)
+        data['type'] = 'IPv6Network'
+        if network.version == 4:
+            data['type'] = 'IPv4Network'
+        data = json.dumps(data)
+        return data
+
+def main():
+    AddressAllocate()
+
+if __name__ == '__main__':
+    main()
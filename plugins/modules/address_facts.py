@@ -16,15 +16,7 @@ class AddressFacts(BluecatModule):
 
     def exec_module(self, **kwargs):
         results = dict(ansible_facts=dict(addresses=[]))
-        response = self.client.http_get('/addresses',
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            addresses = response['data']
-            results['ansible_facts']['addresses'] = addresses
+        results['ansible_facts']['addresses'] = self.get_facts('/addresses')
         return results
 
 def main():
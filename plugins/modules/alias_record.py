@@ -9,6 +9,9 @@ import json
 from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
 
 class AliasRecord(BluecatModule):
+    deployment_services = ('DNS',)
+    applied_key = ('configuration', 'view', 'zone', 'name')
+
     def __init__(self):
         self.module_args = dict(
             state=dict(type='str', default='present', choices=['present', 'absent']),
@@ -53,17 +56,12 @@ class AliasRecord(BluecatModule):
             return rr['data'][0]
 
     def get_zone_id(self):
-        filter = 'configuration.name:eq("{}") and view.name:eq("{}") and absoluteName:eq("{}")'.format(
-            self.module.params.get('configuration'), self.module.params.get('view'), self.module.params.get('zone'))
-        zones = self.client.http_get('/zones',
-                                              params={'limit': 1,
-                                                      'filter': filter
-                                                     }
-                                              )
-        if zones['count'] == 0:
+        zone = self.get_zone_by_fqdn(self.module.params.get('configuration'), self.module.params.get('zone'),
+                                     view=self.module.params.get('view'))
+        if zone is None:
             return None
         else:
-            return zones['data'][0]['id']
+            return zone['id']
 
     def create_alias_record(self, zone_id):
         changed = True
@@ -10,6 +10,8 @@ import ipaddress
 from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
 
 class Block(BluecatModule):
+    applied_key = ('configuration', 'range')
+
     def __init__(self):
         self.module_args = dict(
             state=dict(type='str', default='present', choices=['present', 'absent']),
@@ -63,19 +65,17 @@ class Block(BluecatModule):
             return blocks['data'][0]
 
     def get_configuration_id(self):
-        filter = 'name:eq("{}")'.format(self.module.params.get('configuration'))
-        configurations = self.client.http_get('/configurations',
-                                              params={'limit': 1,
-                                                      'filter': filter
-                                                     }
-                                              )
-        if configurations['count'] == 0:
+        configuration = self.get_configuration_by_name(self.module.params.get('configuration'))
+        if configuration is None:
             self.fail_json('No configuration with name {} found!'.format(self.module.params.get('configuration')))
         else:
-            return configurations['data'][0]['id']
+            return configuration['id']
 
     def find_parent_id(self):
         range = self.module.params.get('range')
+        index = self.get_containment_index(self.module.params.get('configuration'), ('blocks',))
+        if index is not None:
+            return index.deepest(range, 'blocks')
         network_address = range.split('/')[0]
         filter = 'configuration.name:eq("{}") and range:contains("{}")'.format(self.module.params.get('configuration'), network_address)
         block = self.client.http_get('/blocks',
@@ -87,18 +87,6 @@ class Block(BluecatModule):
         else:
             return block['data'][-1]['id']
 
-    def get_zone_id(self, absolute_name):
-        filter = 'configuration.name:eq("{}") and absoluteName:eq("{}")'.format(self.module.params.get('configuration'), absolute_name)
-        networks = self.client.http_get('/zones',
-                                        params={'limit': 1,
-                                                'filter': filter
-                                                }
-                                        )
-        if networks['count'] == 0:
-            return None
-        else:
-            return networks['data'][0]['id']
-
     def create_top_block(self):
         changed = True
         result = None
@@ -108,6 +96,7 @@ class Block(BluecatModule):
             result = self.client.http_post(f'/configurations/{config_id}/blocks',
                                            data=data,
                                            headers=self.headers)
+            self.add_range('blocks', self.module.params.get('configuration'), result)
         self.exit_json(changed=changed, result=str(result))
 
     def create_sub_block(self, parent_id):
@@ -118,6 +107,7 @@ class Block(BluecatModule):
             result = self.client.http_post(f'/blocks/{parent_id}/blocks',
                                             data=data,
                                             headers=self.headers)
+            self.add_range('blocks', self.module.params.get('configuration'), result)
         self.exit_json(changed=changed, result=str(result))
 
     def update_block(self, id):
@@ -151,10 +141,11 @@ class Block(BluecatModule):
             data['defaultZonesInherited'] = self.module.params.get('defaultZonesInherited')
             if self.module.params.get('defaultZones'):
                 data['defaultZones'] = []
+                zones = self.get_zones_by_fqdn(self.module.params.get('configuration'),
+                                               self.module.params.get('defaultZones'))
                 for zone in self.module.params.get('defaultZones'):
-                    zone_id = self.get_zone_id(zone)
                     data['defaultZones'].append({'type': 'Zone',
-                                                 'id': zone_id,
+                                                 'id': zones.get(zone, {}).get('id'),
                                                  'absoluteName': zone})
             data['restrictedZonesInherited'] = self.module.params.get('restrictedZonesInherited')
             data['reverseZoneSigned'] = self.module.params.get('reverseZoneSigned')
@@ -16,15 +16,7 @@ class BlockFacts(BluecatModule):
 
     def exec_module(self, **kwargs):
         results = dict(ansible_facts=dict(blocks=[]))
-        response = self.client.http_get('/blocks',
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            blocks = response['data']
-            results['ansible_facts']['blocks'] = blocks
+        results['ansible_facts']['blocks'] = self.get_facts('/blocks')
         return results
 
 def main():
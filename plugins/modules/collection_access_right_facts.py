@@ -62,15 +62,7 @@ class CollectionAccessRightFacts(BluecatModule):
                 self.fail_json(f'Could not find configuration with name {resource}')
             collection_id = configuration.get('id')
 
-        response = self.client.http_get(f'/{collection}/{collection_id}/accessRights',
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            collection_access_rights = response['data']
-            results['ansible_facts']['collection_access_rights'] = collection_access_rights
+        results['ansible_facts']['collection_access_rights'] = self.get_facts(f'/{collection}/{collection_id}/accessRights')
         return results
 
 def main():
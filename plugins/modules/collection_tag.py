@@ -9,6 +9,8 @@ import json
 from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
 
 class CollectionTag(BluecatModule):
+    applied_key = ('configuration', 'collection', 'resource', 'name')
+
     def __init__(self):
         self.module_args = dict(
             state=dict(type='str', default='present', choices=['present', 'absent']),
@@ -34,15 +34,7 @@ class CollectionTagFacts(BluecatModule):
             if block == None:
                 self.fail_json(msg='Could not find block resource!')
             collection_id = block.get('id')
-        response = self.client.http_get(f'/{collection}/{collection_id}/tags',
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            collection_tags = response['data']
-            results['ansible_facts']['collection_tags'] = collection_tags
+        results['ansible_facts']['collection_tags'] = self.get_facts(f'/{collection}/{collection_id}/tags')
         return results
 
 def main():
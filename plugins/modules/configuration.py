@@ -9,6 +9,8 @@ import json
 from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
 
 class Configuration(BluecatModule):
+    applied_key = ('name',)
+
     def __init__(self):
         self.module_args = dict(
             state=dict(type='str', default='present', choices=['present', 'absent']),
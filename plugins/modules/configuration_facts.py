@@ -16,15 +16,7 @@ class ConfigurationFacts(BluecatModule):
 
     def exec_module(self, **kwargs):
         results = dict(ansible_facts=dict(configurations=[]))
-        response = self.client.http_get('/configurations',
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            configurations = response['data']
-            results['ansible_facts']['configurations'] = configurations
+        results['ansible_facts']['configurations'] = self.get_facts('/configurations')
         return results
 
 def main():
@@ -9,6 +9,8 @@ import json
 from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
 
 class DeploymentRole(BluecatModule):
+    applied_key = ('configuration', 'collection', 'resource', 'interface', 'type')
+
     def __init__(self):
         self.module_args = dict(
             state=dict(type='str', default='present', choices=['present', 'absent']),
@@ -53,16 +55,11 @@ class DeploymentRole(BluecatModule):
         self.exit_json(changed=changed, result=str(result))
 
     def get_interface_id(self):
-        filter = 'configuration.name:eq("{}") and name:eq("{}")'.format(self.module.params.get('configuration'), self.module.params.get('interface'))
-        interfaces = self.client.http_get('/interfaces',
-                                       params={'limit': 1,
-                                               'filter': filter,
-                                               },
-                                       headers=self.headers)
-        if interfaces['count'] == 0:
+        interface = self.get_interface_by_name(self.module.params.get('configuration'), self.module.params.get('interface'))
+        if interface is None:
             return None
         else:
-            return interfaces['data'][0]['id']
+            return interface['id']
 
     def find_deployment_role_id(self, deployment_roles):
         for role in deployment_roles:
@@ -85,42 +82,25 @@ class DeploymentRole(BluecatModule):
             return deployment_roles['data']
 
     def get_block_id(self):
-        filter = 'configuration.name:eq("{}") and range:eq("{}")'.format(self.module.params.get('configuration'), self.module.params.get('resource'))
-        blocks = self.client.http_get('/blocks',
-                                              params={'limit': 1,
-                                                      'filter': filter,
-                                                      'fields': 'embed(defaultZones)'
-                                                     }
-                                              )
-        if blocks['count'] == 0:
+        block = self.get_block_by_range(self.module.params.get('configuration'), self.module.params.get('resource'))
+        if block is None:
             return None
         else:
-            return blocks['data'][0]['id']
+            return block['id']
 
     def get_network_id(self):
-        filter = 'configuration.name:eq("{}") and range:eq("{}")'.format(self.module.params.get('configuration'), self.module.params.get('resource'))
-        networks = self.client.http_get('/networks',
-                                              params={'limit': 1,
-                                                      'filter': filter,
-                                                      'fields': 'embed(userDefinedLinks)'
-                                                     }
-                                              )
-        if networks['count'] == 0:
+        network = self.get_network_by_range(self.module.params.get('configuration'), self.module.params.get('resource'))
+        if network is None:
             return None
         else:
-            return networks['data'][0]['id']
+            return network['id']
 
     def get_zone_id(self):
-        filter = 'configuration.name:eq("{}") and absoluteName:eq("{}")'.format(self.module.params.get('configuration'), self.module.params.get('resource'))
-        networks = self.client.http_get('/zones',
-                                        params={'limit': 1,
-                                                'filter': filter
-                                                }
-                                        )
-        if networks['count'] == 0:
+        zone = self.get_zone_by_fqdn(self.module.params.get('configuration'), self.module.params.get('resource'))
+        if zone is None:
             return None
         else:
-            return networks['data'][0]['id']
+            return zone['id']
 
     def create_deployment_role(self, collection_id):
         changed = True
@@ -33,61 +33,32 @@ class DeploymentRoleFacts(BluecatModule):
             collection_id = self.get_zone_id()
 
         if collection_id:
-            response = self.client.http_get(f'/{self.module.params.get("collection")}/{collection_id}/deploymentRoles',
-                                            params={'limit': self.module.params.get('limit'),
-                                                    'filter': self.module.params.get('filter'),
-                                                    'fields': self.module.params.get('fields')
-                                                    }
-                                            )
+            url = f'/{self.module.params.get("collection")}/{collection_id}/deploymentRoles'
         else:
-            response = self.client.http_get('/deploymentRoles',
-                                            params={'limit': self.module.params.get('limit'),
-                                                    'filter': self.module.params.get('filter'),
-                                                    'fields': self.module.params.get('fields')
-                                                    }
-                                            )
-        if response['count'] > 0:
-            deploymentRoles = response['data']
-            results['ansible_facts']['deploymentRoles'] = deploymentRoles
+            url = '/deploymentRoles'
+        results['ansible_facts']['deploymentRoles'] = self.get_facts(url)
         return results
 
     def get_block_id(self):
-        filter = 'configuration.name:eq("{}") and range:eq("{}")'.format(self.module.params.get('configuration'), self.module.params.get('resource'))
-        blocks = self.client.http_get('/blocks',
-                                              params={'limit': 1,
-                                                      'filter': filter,
-                                                      'fields': 'embed(defaultZones)'
-                                                     }
-                                              )
-        if blocks['count'] == 0:
+        block = self.get_block_by_range(self.module.params.get('configuration'), self.module.params.get('resource'))
+        if block is None:
             return None
         else:
-            return blocks['data'][0]['id']
+            return block['id']
 
     def get_network_id(self):
-        filter = 'configuration.name:eq("{}") and range:eq("{}")'.format(self.module.params.get('configuration'), self.module.params.get('resource'))
-        networks = self.client.http_get('/networks',
-                                              params={'limit': 1,
-                                                      'filter': filter,
-                                                      'fields': 'embed(userDefinedLinks)'
-                                                     }
-                                              )
-        if networks['count'] == 0:
+        network = self.get_network_by_range(self.module.params.get('configuration'), self.module.params.get('resource'))
+        if network is None:
             return None
         else:
-            return networks['data'][0]['id']
+            return network['id']
 
     def get_zone_id(self):
-        filter = 'configuration.name:eq("{}") and absoluteName:eq("{}")'.format(self.module.params.get('configuration'), self.module.params.get('resource'))
-        networks = self.client.http_get('/zones',
-                                        params={'limit': 1,
-                                                'filter': filter
-                                                }
-                                        )
-        if networks['count'] == 0:
+        zone = self.get_zone_by_fqdn(self.module.params.get('configuration'), self.module.params.get('resource'))
+        if zone is None:
             return None
         else:
-            return networks['data'][0]['id']
+            return zone['id']
 
 def main():
     DeploymentRoleFacts()
@@ -0,0 +1,321 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2026, Philipp Fromme <philipp.fromme@uni-paderborn.de>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+import datetime
+import heapq
+import json
+import os
+import time
+
+from ansible_collections.local.bluecat.plugins.module_utils.bc_filter import get_field
+from ansible_collections.local.bluecat.plugins.module_utils.bc_ipindex import ContainmentIndex
+from ansible_collections.local.bluecat.plugins.module_utils.bc_snapshot import (SNAPSHOT_COLLECTIONS, SnapshotUpdater,
+                                                                                SnapshotWriter, diff_sorted)
+from ansible_collections.local.bluecat.plugins.module_utils.bc_util import (BluecatModule, PAGE_SIZE, in_filters,
+                                                                           paginate, parse_bam_datetime,
+                                                                           stream_concurrently)
+
+# collections synced by delta, in this order; the others are read again completely
+INCREMENTAL_COLLECTIONS = ['zones', 'resourceRecords', 'blocks', 'networks', 'addresses']
+# seconds of request latency and clock drift the watermarks move back on top
+# of the duration of the run
+WATERMARK_MARGIN = 60
+
+
+def rewind(value, seconds):
+    """Returns a BAM timestamp moved back by seconds, in the format BAM uses,
+    and any other value unchanged."""
+    try:
+        timestamp = parse_bam_datetime(value)
+    except (AttributeError, TypeError, ValueError):
+        return value
+    if timestamp is None:
+        return value
+    moment = datetime.datetime.fromtimestamp(timestamp - seconds, datetime.timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+class ExportSnapshot(BluecatModule):
+    def __init__(self):
+        self.module_args = dict(
+            configuration=dict(required=True, type='str'),
+            path=dict(required=True, type='path'),
+            collections=dict(type='list', elements='str', default=SNAPSHOT_COLLECTIONS,
+                             choices=SNAPSHOT_COLLECTIONS),
+            incremental=dict(type='bool', default=False),
+            modified_field=dict(type='str', default='modifiedTime'),
+            concurrency=dict(type='int', default=4),
+            page_size=dict(type='int', default=PAGE_SIZE)
+        )
+
+        # highest modified_field value seen per collection
+        self.watermarks = dict()
+        self.started = time.monotonic()
+
+        super(ExportSnapshot, self).__init__(self.module_args,
+                                             supports_check_mode=True)
+
+    def exec_module(self, **kwargs):
+        configuration = self.get_configuration_by_name(self.module.params.get('configuration'))
+        if configuration is None:
+            self.fail_json(msg='Could not find configuration {}!'.format(self.module.params.get('configuration')))
+        path = self.module.params.get('path')
+        if self.module.check_mode:
+            return dict(changed=True, path=path)
+
+        if self.module.params.get('incremental') and os.path.isfile(path):
+            updater = SnapshotUpdater(path)
+            if updater.meta.get('configuration') == configuration['name'] and \
+                    updater.meta.get('modified_field') == self.module.params.get('modified_field'):
+                try:
+                    deleted = self.sync(updater, configuration)
+                    updater.set_meta('watermarks', self.saved_watermarks())
+                    updater.set_meta('synced', time.time())
+                    updater.close()
+                except Exception as e:
+                    updater.abort()
+                    self.fail_json(msg='Failed to sync configuration {}: {}'.format(configuration['name'], e))
+                return dict(changed=True, path=path, sync_mode='incremental', counts=updater.counts, deleted=deleted)
+            updater.abort()
+
+        writer = SnapshotWriter(path)
+        try:
+            self.export(writer, configuration, self.module.params.get('collections'))
+            writer.set_meta('configuration', configuration['name'])
+            writer.set_meta('collections', self.module.params.get('collections'))
+            writer.set_meta('modified_field', self.module.params.get('modified_field'))
+            writer.set_meta('watermarks', self.saved_watermarks())
+            writer.set_meta('exported', time.time())
+            writer.close()
+        except Exception as e:
+            writer.abort()
+            self.fail_json(msg='Failed to export configuration {}: {}'.format(configuration['name'], e))
+        return dict(changed=True, path=path, sync_mode='full', counts=writer.counts)
+
+    def stream(self, url, params=None, concurrency=None):
+        if concurrency is None:
+            concurrency = self.module.params.get('concurrency')
+        return paginate(self.client, url, params, self.module.params.get('page_size'), concurrency)
+
+    def add(self, store, collection, obj, parent_id=None):
+        modified = get_field(obj, self.module.params.get('modified_field'))
+        if modified is not None and (collection not in self.watermarks or modified > self.watermarks[collection]):
+            self.watermarks[collection] = modified
+        store.add(collection, obj, parent_id)
+
+    def saved_watermarks(self):
+        """Returns the watermarks for the next run. An object changed while
+        this run listed its collection can have an older modified_field than
+        objects listed after it, so the watermarks move back by the duration
+        of the run, which covers every listing, plus WATERMARK_MARGIN."""
+        seconds = time.monotonic() - self.started + WATERMARK_MARGIN
+        return {x: rewind(y, seconds) for x, y in self.watermarks.items()}
+
+    def link(self, obj, *fields):
+        return {x: obj.get(x) for x in ('id', 'type') + fields}
+
+    def linked(self, obj, **links):
+        # nested lookups like configuration.name:eq() need the parent objects
+        for key, value in links.items():
+            if obj.get(key) is None:
+                obj[key] = value
+        return obj
+
+    def get_views(self, configuration):
+        return list(self.stream(f'/configurations/{configuration["id"]}/views'))
+
+    def export(self, writer, configuration, collections):
+        collections = set(collections)
+        configuration_link = self.link(configuration, 'name')
+        by_configuration = {'filter': 'configuration.name:eq("{}")'.format(configuration['name'])}
+
+        if 'configurations' in collections:
+            self.add(writer, 'configurations', configuration)
+
+        views = self.get_views(configuration)
+        if 'views' in collections:
+            for view in views:
+                self.add(writer, 'views', self.linked(view, configuration=configuration_link), configuration['id'])
+
+        zones = []
+        if collections & {'zones', 'resourceRecords'}:
+            for url, filter, links in self.listings('zones', configuration, views):
+                for zone in self.stream(url, {'filter': filter}):
+                    if 'zones' in collections:
+                        self.add(writer, 'zones', self.linked(zone, **links), links['view']['id'])
+                    zones.append((self.link(zone, 'absoluteName'), links['view']))
+
+        if 'resourceRecords' in collections:
+            # many small zones, so the zones are read in parallel instead of their pages
+            def fetch(zone):
+                return self.stream(f'/zones/{zone[0]["id"]}/resourceRecords', concurrency=1)
+
+            for (zone_link, view_link), records in stream_concurrently(fetch, zones,
+                                                                       self.module.params.get('concurrency'),
+                                                                       self.module.params.get('page_size')):
+                for rr in records:
+                    rr = self.linked(rr, configuration=configuration_link, view=view_link, zone=zone_link)
+                    self.add(writer, 'resourceRecords', rr, zone_link['id'])
+
+        if collections & {'blocks', 'networks', 'addresses'}:
+            blocks = list(self.stream('/blocks', by_configuration))
+            networks = list(self.stream('/networks', by_configuration))
+            index = ContainmentIndex(blocks + networks)
+            if 'blocks' in collections:
+                for block in blocks:
+                    self.add(writer, 'blocks', self.linked(block, configuration=configuration_link),
+                             index.deepest(block['range'], 'blocks', exclude=block['id']))
+            if 'networks' in collections:
+                for network in networks:
+                    self.add(writer, 'networks', self.linked(network, configuration=configuration_link),
+                             index.deepest(network['range'], 'blocks'))
+            if 'addresses' in collections:
+                for address in self.stream('/addresses', by_configuration):
+                    self.add(writer, 'addresses', self.linked(address, configuration=configuration_link),
+                             index.deepest(address['address'], 'networks'))
+
+        if collections & {'tagGroups', 'tags'}:
+            tag_groups = list(self.stream('/tagGroups'))
+            for tag_group in tag_groups:
+                if 'tagGroups' in collections:
+                    self.add(writer, 'tagGroups', tag_group)
+                if 'tags' in collections:
+                    for tag in self.stream(f'/tagGroups/{tag_group["id"]}/tags'):
+                        self.add(writer, 'tags', tag, tag_group['id'])
+
+        if 'accessRights' in collections:
+            for access_right in self.stream('/accessRights'):
+                self.add(writer, 'accessRights', access_right, (access_right.get('resource') or {}).get('id'))
+
+        if 'deploymentRoles' in collections:
+            for role in self.stream('/deploymentRoles'):
+                self.add(writer, 'deploymentRoles', role, (role.get('collection') or {}).get('id'))
+
+    def listings(self, collection, configuration, views):
+        """Returns (url, filter, links) of the listings that together hold
+        all objects of an incrementally synced collection."""
+        configuration_link = self.link(configuration, 'name')
+        by_configuration = 'configuration.name:eq("{}")'.format(configuration['name'])
+        if collection == 'zones':
+            return [('/zones', '{} and view.name:eq("{}")'.format(by_configuration, x['name']),
+                     dict(configuration=configuration_link, view=self.link(x, 'name'))) for x in views]
+        return [(f'/{collection}', by_configuration, dict(configuration=configuration_link))]
+
+    def sync(self, updater, configuration):
+        """Brings an existing snapshot up to date and returns the number of
+        deleted objects per collection. Objects with a modified_field at or
+        after the watermark of the last run are upserted, all objects of a
+        collection without a watermark are read again. Deletions, and
+        objects the delta missed, are found by merging the ascending ids of
+        the snapshot with an id-only listing, one id of each at a time."""
+        collections = updater.meta.get('collections', [])
+        self.watermarks = dict(updater.meta.get('watermarks') or {})
+        small = [x for x in collections if x not in INCREMENTAL_COLLECTIONS]
+        for collection in small:
+            updater.clear(collection)
+        self.export(updater, configuration, small)
+
+        views = self.get_views(configuration)
+        zones = dict()
+        index = None
+        deleted = dict()
+        for collection in [x for x in INCREMENTAL_COLLECTIONS if x in collections]:
+            if collection == 'resourceRecords':
+                # absoluteName -> zones of that name, to find the zone of changed records
+                for id, absolute_name, data in updater.select('zones', 'absoluteName', 'data'):
+                    zone = json.loads(data)
+                    zones.setdefault(absolute_name, []).append((self.link(zone, 'absoluteName'), zone.get('view')))
+            if collection == 'addresses':
+                index = self.update_parents(updater, deleted)
+
+            def parent(obj, links):
+                if collection == 'zones':
+                    return links['view']['id']
+                if collection == 'resourceRecords':
+                    zone_link, view_link = self.find_zone(zones, obj)
+                    self.linked(obj, zone=zone_link, view=view_link)
+                    return (zone_link or {}).get('id')
+                if collection == 'addresses':
+                    return index.deepest(obj['address'], 'networks')
+                return None
+
+            listings = self.listings(collection, configuration, views)
+            watermark = self.watermarks.get(collection)
+            for url, filter, links in listings:
+                if watermark is not None:
+                    filter = '{} and {}:ge("{}")'.format(filter, self.module.params.get('modified_field'), watermark)
+                # without a watermark changed objects cannot be told apart,
+                # so the whole collection is read and upserted again
+                for obj in self.stream(url, {'filter': filter}):
+                    obj = self.linked(obj, **links)
+                    self.add(updater, collection, obj, parent(obj, links))
+
+            remote = heapq.merge(*[(x['id'] for x in self.stream(url, {'filter': filter, 'fields': 'id',
+                                                                       'orderBy': 'asc(id)'}))
+                                   for url, filter, links in listings])
+            deleted_ids = []
+            missing_ids = []
+            for local_id, remote_id in diff_sorted((x[0] for x in updater.select(collection)), remote):
+                if remote_id is None:
+                    deleted_ids.append(local_id)
+                else:
+                    missing_ids.append(remote_id)
+            updater.delete(collection, deleted_ids)
+            deleted[collection] = len(deleted_ids)
+            for url, filter, links in listings:
+                for id_filter in in_filters('id', missing_ids):
+                    for obj in self.stream(url, {'filter': '{} and {}'.format(filter, id_filter)}):
+                        obj = self.linked(obj, **links)
+                        self.add(updater, collection, obj, parent(obj, links))
+
+        if 'addresses' not in collections:
+            self.update_parents(updater, deleted)
+        return deleted
+
+    def find_zone(self, zones, rr):
+        # the zone of a record is the longest suffix of its absoluteName that
+        # names exactly one zone
+        if rr.get('zone'):
+            for zone_link, view_link in zones.get((rr['zone'].get('absoluteName') or '').lower(), []):
+                if zone_link['id'] == rr['zone'].get('id'):
+                    return zone_link, view_link
+        labels = (rr.get('absoluteName') or '').lower().split('.')
+        for i in range(len(labels)):
+            candidates = zones.get('.'.join(labels[i:]), [])
+            if len(candidates) == 1:
+                return candidates[0]
+            if candidates:
+                break
+        return None, None
+
+    def update_parents(self, updater, deleted):
+        """Sets the parents of blocks and networks again if any of them
+        changed and returns the ContainmentIndex for the addresses."""
+        ranges = [{'id': x, 'type': y, 'range': z} for collection in ('blocks', 'networks')
+                  for x, y, z in updater.select(collection, 'type', 'range')]
+        index = ContainmentIndex(ranges)
+        changed = updater.counts.get('blocks') or updater.counts.get('networks') or \
+            deleted.get('blocks') or deleted.get('networks')
+        if not changed:
+            return index
+        updater.set_parents('blocks', [(index.deepest(x['range'], 'blocks', exclude=x['id']), x['id'])
+                                       for x in ranges if x['type'].endswith('block')])
+        updater.set_parents('networks', [(index.deepest(x['range'], 'blocks'), x['id'])
+                                         for x in ranges if not x['type'].endswith('block')])
+        # new or removed networks move existing addresses
+        batch = []
+        for id, address in updater.select('addresses', 'address'):
+            batch.append((index.deepest(address, 'networks'), id))
+            if len(batch) >= updater.batch_size:
+                updater.set_parents('addresses', batch)
+                batch = []
+        updater.set_parents('addresses', batch)
+        return index
+
+def main():
+    ExportSnapshot()
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,8 @@ import json
 from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
 
 class Group(BluecatModule):
+    applied_key = ('name',)
+
     def __init__(self):
         self.module_args = dict(
             state=dict(type='str', default='present', choices=['present', 'absent']),
@@ -48,8 +50,8 @@ class Group(BluecatModule):
 
         state = self.module.params.get('state')
         if state == 'present':
+            data = self.build_data(authenticator_id, authenticator_type)
             if group_id:
-                data = self.build_data(authenticator_id, authenticator_type)
                 if self.compare_data(group, data):
                     self.update_group(group_id, data)
             else:
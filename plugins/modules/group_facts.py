@@ -15,15 +15,7 @@ class GroupFacts(BluecatModule):
 
     def exec_module(self, **kwargs):
         results = dict(ansible_facts=dict(groups=[]))
-        response = self.client.http_get(f'/groups',
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            groups = response['data']
-            results['ansible_facts']['groups'] = groups
+        results['ansible_facts']['groups'] = self.get_facts(f'/groups')
         return results
 
 def main():
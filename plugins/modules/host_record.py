@@ -7,9 +7,12 @@ __metaclass__ = type
 import json
 
 import ipaddress
-from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
+from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule, host_record_data
 
 class HostRecord(BluecatModule):
+    deployment_services = ('DNS',)
+    applied_key = ('configuration', 'view', 'zone', 'name')
+
     def __init__(self):
         self.module_args = dict(
             state=dict(type='str', default='present', choices=['present', 'absent']),
@@ -22,6 +25,9 @@ class HostRecord(BluecatModule):
             x_bcn_orphaned_address_state=dict(type='str', default="")
         )
 
+        # resolved once per task and shared by build_data and compare_data
+        self.address_ids = None
+
         super(HostRecord, self).__init__(self.module_args,
                                          supports_check_mode=True)
 
@@ -57,17 +63,12 @@ class HostRecord(BluecatModule):
             return rr['data'][0]
 
     def get_zone_id(self):
-        filter = 'configuration.name:eq("{}") and view.name:eq("{}") and absoluteName:eq("{}")'.format(
-            self.module.params.get('configuration'), self.module.params.get('view'), self.module.params.get('zone'))
-        zones = self.client.http_get('/zones',
-                                              params={'limit': 1,
-                                                      'filter': filter
-                                                     }
-                                              )
-        if zones['count'] == 0:
+        zone = self.get_zone_by_fqdn(self.module.params.get('configuration'), self.module.params.get('zone'),
+                                     view=self.module.params.get('view'))
+        if zone is None:
             return None
         else:
-            return zones['data'][0]['id']
+            return zone['id']
 
     def create_host_record(self, zone_id):
         changed = True
@@ -98,40 +99,20 @@ class HostRecord(BluecatModule):
                                              headers=self.headers)
         self.exit_json(changed=changed, result=str(result))
 
-    def build_data(self):
-        data = dict()
-        data['name'] = self.module.params.get('name')
-        data['type'] = "HostRecord"
-        data['reverseRecord'] = self.module.params.get('reverseRecord')
-        addresses = self.module.params.get('addresses')
-        data_addresses = []
-        for address in addresses:
-            data_type = 'IPv6Address'
-            if ipaddress.ip_address(address).version == 4:
-                data_type = 'IPv4Address'
-            data_id = self.get_address_id(address)
-            if data_id:
-                data_addresses.append({'type': data_type, 'id': data_id})
-            else:
-                data_addresses.append({'type': data_type, 'address': address})
-        data['addresses'] = data_addresses
-        data = json.dumps(data)
-        return data
-
-    def get_address_id(self, address):
-        filter = 'configuration.name:eq("{}") and address:eq("{}")'.format(self.module.params.get('configuration'), address)
-        addresses = self.client.http_get('/addresses',
-                                     params={'limit': 1,
-                                             'filter': filter
-                                             }
-                                     )
-        if addresses['count'] == 0:
-            return None
-        else:
-            return addresses['data'][0]['id']
+    def build_data(self, resolve_addresses=True):
+        address_ids = None
+        if resolve_addresses:
+            if self.address_ids is None:
+                self.address_ids = self.get_address_ids(self.module.params.get('configuration'),
+                                                        self.module.params.get('addresses'))
+            address_ids = self.address_ids
+        data = host_record_data(self.module.params.get('name'), self.module.params.get('reverseRecord'),
+                                self.module.params.get('addresses'), address_ids)
+        return json.dumps(data)
 
     def compare_data(self, rr):
-        data = json.loads(self.build_data())
+        # addresses are compared by value, their IDs are not needed here
+        data = json.loads(self.build_data(resolve_addresses=False))
         for key, value in data.items():
             if key == 'addresses':
                 ipam_addresses = rr.get('_embedded').get('addresses')
@@ -0,0 +1,114 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2026, Philipp Fromme <philipp.fromme@uni-paderborn.de>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+import json
+
+import ipaddress
+from ansible_collections.local.bluecat.plugins.module_utils.bc_util import (BluecatModule, PAGE_SIZE, host_record_data,
+                                                                           paginate)
+
+class HostRecords(BluecatModule):
+    deployment_services = ('DNS',)
+
+    def __init__(self):
+        self.module_args = dict(
+            configuration=dict(required=True, type='str'),
+            view=dict(required=True, type='str'),
+            zone=dict(required=True, type='str'),
+            records=dict(required=True, type='list', elements='dict',
+                         options=dict(
+                             name=dict(required=True, type='str'),
+                             state=dict(type='str', default='present', choices=['present', 'absent']),
+                             reverseRecord=dict(type='bool', default=True),
+                             addresses=dict(type='list', elements='str', default=[])
+                         )),
+            x_bcn_orphaned_address_state=dict(type='str', default=""),
+            concurrency=dict(type='int', default=4),
+            page_size=dict(type='int', default=PAGE_SIZE)
+        )
+
+        super(HostRecords, self).__init__(self.module_args,
+                                          supports_check_mode=True)
+
+    def exec_module(self, **kwargs):
+        zone = self.get_zone_by_fqdn(self.module.params.get('configuration'), self.module.params.get('zone'),
+                                     view=self.module.params.get('view'))
+        if zone is None:
+            self.fail_json(msg='Could not find zone {}!'.format(self.module.params.get('zone')))
+        zone_id = zone['id']
+
+        existing = self.get_host_records(zone_id)
+        creates, updates, deletes = self.diff_records(existing)
+
+        requests = []
+        if not self.module.check_mode:
+            address_ids = self.get_address_ids(self.module.params.get('configuration'),
+                                               set(y for x in creates + [z[1] for z in updates] for y in x['addresses']))
+            requests += [('POST', f'/zones/{zone_id}/resourceRecords', x['name'], self.build_data(x, address_ids))
+                         for x in creates]
+            requests += [('PUT', f'/resourceRecords/{x}', y['name'], self.build_data(y, address_ids))
+                         for x, y in updates]
+            requests += [('DELETE', f'/resourceRecords/{x}', y, None) for x, y in deletes]
+        failed = self.apply(requests)
+
+        result = dict(changed=bool(creates or updates or deletes),
+                      created=[x['name'] for x in creates],
+                      updated=[x[1]['name'] for x in updates],
+                      deleted=[x[1] for x in deletes])
+        if failed:
+            self.fail_json(msg='Failed to apply {} of the record changes'.format(len(failed)),
+                           failed=failed, **result)
+        return result
+
+    def get_host_records(self, zone_id):
+        host_records = dict()
+        for rr in paginate(self.client, f'/zones/{zone_id}/resourceRecords',
+                           params={'filter': 'type:eq("HostRecord")',
+                                   'fields': 'embed(addresses)'
+                                   },
+                           page_size=self.module.params.get('page_size'),
+                           concurrency=self.module.params.get('concurrency')):
+            host_records[rr['name']] = rr
+        return host_records
+
+    def diff_records(self, existing):
+        creates = []
+        updates = []
+        deletes = []
+        for record in self.module.params.get('records'):
+            rr = existing.get(record['name'])
+            if record['state'] == 'absent':
+                if rr:
+                    deletes.append((rr['id'], record['name']))
+            elif rr is None:
+                creates.append(record)
+            elif self.compare_data(rr, record):
+                updates.append((rr['id'], record))
+        return creates, updates, deletes
+
+    def build_data(self, record, address_ids):
+        return json.dumps(host_record_data(record['name'], record['reverseRecord'], record['addresses'], address_ids))
+
+    def compare_data(self, rr, record):
+        if rr.get('reverseRecord') != record['reverseRecord']:
+            return True
+        ipam_addresses = [ipaddress.ip_address(x.get('address')) for x in rr.get('_embedded', {}).get('addresses', [])]
+        task_addresses = [ipaddress.ip_address(x) for x in record['addresses']]
+        return set(ipam_addresses) != set(task_addresses)
+
+    def apply(self, requests):
+        headers = dict(self.headers)
+        headers['x-bcn-orphaned-address-state'] = self.module.params.get('x_bcn_orphaned_address_state')
+        results = self.send_requests([(x[0], x[1], x[3], headers if x[0] == 'DELETE' else self.headers)
+                                      for x in requests],
+                                     self.module.params.get('concurrency'))
+        return [{'name': x[2], 'method': x[0], 'msg': y[1]} for x, y in zip(requests, results) if y[1]]
+
+def main():
+    HostRecords()
+
+if __name__ == '__main__':
+    main()
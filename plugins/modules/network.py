@@ -10,6 +10,14 @@ import ipaddress
 from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
 
 class Network(BluecatModule):
+    applied_key = ('configuration', 'range')
+
+    @property
+    def deployment_services(self):
+        # reverse zones and the DHCP service of the network's IP version
+        version = ipaddress.ip_network(self.module.params.get('range'), strict=False).version
+        return ('DNS', 'DHCPv4' if version == 4 else 'DHCPv6')
+
     def __init__(self):
         self.module_args = dict(
             state=dict(type='str', default='present', choices=['present', 'absent']),
@@ -68,6 +76,9 @@ class Network(BluecatModule):
 
     def get_block_id(self):
         range = self.module.params.get('range')
+        index = self.get_containment_index(self.module.params.get('configuration'), ('blocks',))
+        if index is not None:
+            return index.deepest(range, 'blocks')
         network_address = range.split('/')[0]
         filter = 'configuration.name:eq("{}") and range:ge("{}") and range:contains("{}")'.format(self.module.params.get('configuration'), range, network_address)
         block = self.client.http_get('/blocks',
@@ -80,18 +91,6 @@ class Network(BluecatModule):
         else:
             return block['data'][-1]['id']
 
-    def get_zone_id(self, absolute_name):
-        filter = 'configuration.name:eq("{}") and absoluteName:eq("{}")'.format(self.module.params.get('configuration'), absolute_name)
-        networks = self.client.http_get('/zones',
-                                        params={'limit': 1,
-                                                'filter': filter
-                                                }
-                                        )
-        if networks['count'] == 0:
-            return None
-        else:
-            return networks['data'][0]['id']
-
     def create_network(self, parent_id):
         changed = True
         result = None
@@ -100,6 +99,7 @@ class Network(BluecatModule):
             result = self.client.http_post(f'/blocks/{parent_id}/networks',
                                             data=data,
                                             headers=self.headers)
+            self.add_range('networks', self.module.params.get('configuration'), result)
         self.exit_json(changed=changed, result=str(result))
 
     def update_network(self, id):
@@ -139,10 +139,11 @@ class Network(BluecatModule):
             data['defaultZonesInherited'] = self.module.params.get('defaultZonesInherited')
             if self.module.params.get('defaultZones'):
                 data['defaultZones'] = []
+                zones = self.get_zones_by_fqdn(self.module.params.get('configuration'),
+                                               self.module.params.get('defaultZones'))
                 for zone in self.module.params.get('defaultZones'):
-                    zone_id = self.get_zone_id(zone)
                     data['defaultZones'].append({'type': 'Zone',
-                                                 'id': zone_id,
+                                                 'id': zones.get(zone, {}).get('id'),
                                                  'absoluteName': zone})
         if self.module.params.get('userDefinedFields'):
             data['userDefinedFields'] = self.module.params.get('userDefinedFields')
@@ -44,15 +44,7 @@ class NetworkAddressFacts(BluecatModule):
         else:
             collection_id = self.module.params.get('collection_id')
         url = f"/networks/{collection_id}/addresses"
-        response = self.client.http_get(url,
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            addresses = response['data']
-            results['ansible_facts']['addresses'] = addresses
+        results['ansible_facts']['addresses'] = self.get_facts(url)
         return results
 
 def main():
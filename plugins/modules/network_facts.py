@@ -16,15 +16,7 @@ class NetworkFacts(BluecatModule):
 
     def exec_module(self, **kwargs):
         results = dict(ansible_facts=dict(networks=[]))
-        response = self.client.http_get('/networks',
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            networks = response['data']
-            results['ansible_facts']['networks'] = networks
+        results['ansible_facts']['networks'] = self.get_facts('/networks')
         return results
 
 def main():
@@ -16,15 +16,7 @@ class ResourceRecordFacts(BluecatModule):
 
     def exec_module(self, **kwargs):
         results = dict(ansible_facts=dict(resource_records=[]))
-        response = self.client.http_get('/resourceRecords',
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            resource_records = response['data']
-            results['ansible_facts']['resource_records'] = resource_records
+        results['ansible_facts']['resource_records'] = self.get_facts('/resourceRecords')
         return results
 
 def main():
@@ -5,6 +5,7 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 import json
+import time
 
 from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
 
@@ -24,26 +25,29 @@ class ServerDeployment(BluecatModule):
     def exec_module(self, **kwargs):
         if self.module.params.get('type') == 'DifferentialDeployment' and self.module.params.get('service') != 'DNS':
             self.fail_json(msg='DHCP services do not allow Differential Deployments!')
-        server_id = self.get_server_id(self.module.params.get('name'))
+        configuration = self.module.params.get('configuration')
+        name = self.module.params.get('name')
+        service = self.module.params.get('service')
+        if self.deployment_markers and not self.deployment_markers.pending(configuration, name, service):
+            self.exit_json(changed=False, result='No changes pending for {}'.format(service))
+        server_id = self.get_server_id(name)
         data = self.build_data()
         self.headers['x-bcn-force-zone-retransfer'] = self.module.params.get('x_bcn_force_zone_retransfer')
+        started = time.time()
         result = self.client.http_post(f'/servers/{server_id}/deployments',
                                        data=data,
                                        headers=self.headers)
+        if self.deployment_markers:
+            self.deployment_markers.deployed(configuration, name, service, started)
         changed = True
         self.exit_json(changed=changed, result=str(result))
 
     def get_server_id(self, name):
-        filter = 'configuration.name:eq("{}") and name:eq("{}")'.format(self.module.params.get('configuration'), name)
-        servers = self.client.http_get('/servers',
-                                       params={'limit': 1,
-                                               'filter': filter,
-                                               },
-                                       headers=self.headers)
-        if servers['count'] == 0:
+        server = self.get_server_by_name(self.module.params.get('configuration'), name)
+        if server is None:
             return None
         else:
-            return servers['data'][0]['id']
+            return server['id']
 
     def build_data(self):
         data = dict()
@@ -0,0 +1,143 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2026, Philipp Fromme <philipp.fromme@uni-paderborn.de>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+import json
+import random
+import time
+
+from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule, paginate, run_concurrently
+
+# states of a deployment that is not finished yet
+DEPLOYMENT_PENDING = ('QUEUED', 'RUNNING')
+DEPLOYMENT_SUCCEEDED = ('COMPLETED', 'COMPLETED_WITH_WARNINGS')
+
+
+class ServerDeployments(BluecatModule):
+    def __init__(self):
+        self.module_args = dict(
+            configuration=dict(required=True, type='str'),
+            servers=dict(type='list', elements='str'),
+            type=dict(required=True, type='str', choices=['FullDeployment', 'DifferentialDeployment']),
+            service=dict(required=True, type='str', choices=['DNS', 'DHCPv4', 'DHCPv6']),
+            x_bcn_force_zone_retransfer=dict(type='str', default='False', choices=['False', 'True']),
+            concurrency=dict(type='int', default=4),
+            wait=dict(type='bool', default=True),
+            timeout=dict(type='int', default=600),
+            poll_interval=dict(type='float', default=1.0),
+            poll_interval_max=dict(type='float', default=15.0)
+        )
+
+        super(ServerDeployments, self).__init__(self.module_args,
+                                                supports_check_mode=True)
+
+    def exec_module(self, **kwargs):
+        if self.module.params.get('type') == 'DifferentialDeployment' and self.module.params.get('service') != 'DNS':
+            self.fail_json(msg='DHCP services do not allow Differential Deployments!')
+        servers = self.get_servers()
+        skipped = []
+        if self.deployment_markers:
+            configuration = self.module.params.get('configuration')
+            service = self.module.params.get('service')
+            skipped = [x['name'] for x in servers
+                       if not self.deployment_markers.pending(configuration, x['name'], service)]
+            servers = [x for x in servers if x['name'] not in skipped]
+        if self.module.check_mode:
+            return dict(changed=bool(servers), deployments=[{'server': x['name']} for x in servers],
+                        skipped=skipped)
+
+        started = time.monotonic()
+        deployments = run_concurrently(self.deploy, servers, self.module.params.get('concurrency'))
+        result = dict(changed=bool(deployments),
+                      deployments=deployments,
+                      skipped=skipped,
+                      duration=round(time.monotonic() - started, 3))
+        failed = [x['server'] for x in deployments if x.get('msg')]
+        if failed:
+            self.fail_json(msg='Deployment failed on {} of {} servers: {}'.format(len(failed), len(deployments),
+                                                                                 ', '.join(failed)),
+                           **result)
+        return result
+
+    def get_servers(self):
+        configuration = self.module.params.get('configuration')
+        names = self.module.params.get('servers')
+        if names is None:
+            # every server of the configuration
+            filter = 'configuration.name:eq("{}")'.format(configuration)
+            return list(paginate(self.client, '/servers', {'filter': filter}))
+        servers = self.get_servers_by_name(configuration, names)
+        missing = [x for x in names if x not in servers]
+        if missing:
+            self.fail_json(msg='Could not find servers {} in configuration {}!'.format(', '.join(missing),
+                                                                                     configuration))
+        return [servers[x] for x in names]
+
+    def deploy(self, server):
+        """Starts the deployment of one server and, with wait, polls it until it
+        is finished. Runs in one of concurrency threads, so at most that many
+        deployments are in progress at a time."""
+        headers = dict(self.headers)
+        headers['x-bcn-force-zone-retransfer'] = self.module.params.get('x_bcn_force_zone_retransfer')
+        started = time.monotonic()
+        # changes marked from now on are not part of this deployment
+        marked = time.time()
+        result = {'server': server['name']}
+        try:
+            deployment = self.client.http_post(f"/servers/{server['id']}/deployments",
+                                               data=self.build_data(),
+                                               headers=headers)
+            result.update(id=deployment.get('id'), state=deployment.get('state'))
+            if self.module.params.get('wait'):
+                result['state'] = self.wait(deployment, started)
+        except Exception as e:
+            result['msg'] = str(e)
+        result['duration'] = round(time.monotonic() - started, 3)
+        if 'msg' not in result and self.module.params.get('wait'):
+            if result['state'] in DEPLOYMENT_PENDING:
+                result['msg'] = 'Timed out after {}s in state {}'.format(self.module.params.get('timeout'),
+                                                                         result['state'])
+            elif result['state'] not in DEPLOYMENT_SUCCEEDED:
+                result['msg'] = 'Deployment ended in state {}'.format(result['state'])
+        if self.deployment_markers and 'msg' not in result:
+            self.deployment_markers.deployed(self.module.params.get('configuration'), server['name'],
+                                             self.module.params.get('service'), marked)
+        return result
+
+    def wait(self, deployment, started):
+        """Polls the deployment until it leaves the pending states or the
+        timeout passes and returns its last state. The poll interval doubles
+        while the state stays the same and starts over when it changes, so
+        short deployments are seen quickly and long ones cost few requests."""
+        deadline = started + self.module.params.get('timeout')
+        interval = self.module.params.get('poll_interval')
+        state = deployment.get('state')
+        while state in DEPLOYMENT_PENDING:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # jitter keeps the polls of servers started together apart
+            time.sleep(min(remaining, random.uniform(0.5, 1.0) * interval))
+            previous = state
+            state = self.client.http_get(f"/deployments/{deployment['id']}", headers=self.headers,
+                                         memo=False).get('state')
+            if state == previous:
+                interval = min(interval * 2, self.module.params.get('poll_interval_max'))
+            else:
+                interval = self.module.params.get('poll_interval')
+        return state
+
+    def build_data(self):
+        data = dict()
+        data['type'] = self.module.params.get('type')
+        data['service'] = self.module.params.get('service')
+        data = json.dumps(data)
+        return data
+
+def main():
+    ServerDeployments()
+
+if __name__ == '__main__':
+    main()
@@ -24,22 +24,9 @@ class TagFacts(BluecatModule):
             if parent == None:
                 self.fail_json("Could not find tagGroup!")
             parent_id = parent.get('id')
-            response = self.client.http_get(f'/tagGroups/{parent_id}/tags',
-                                            params={'limit': self.module.params.get('limit'),
-                                                    'filter': self.module.params.get('filter'),
-                                                    'fields': self.module.params.get('fields')
-                                                    }
-                                            )
+            results['ansible_facts']['tags'] = self.get_facts(f'/tagGroups/{parent_id}/tags')
         else:
-            response = self.client.http_get('/tags',
-                                            params={'limit': self.module.params.get('limit'),
-                                                    'filter': self.module.params.get('filter'),
-                                                    'fields': self.module.params.get('fields')
-                                                    }
-                                            )
-        if response['count'] > 0:
-            tags = response['data']
-            results['ansible_facts']['tags'] = tags
+            results['ansible_facts']['tags'] = self.get_facts('/tags')
         return results
 
 def main():
@@ -13,6 +13,8 @@ from ansible_collections.local.bluecat.plugins.module_utils.bc_util import Bluec
 
 
 class TagGroup(BluecatModule):
+    applied_key = ('name',)
+
     def __init__(self):
         self.module_args = dict(
             state=dict(type='str', default='present', choices=['present', 'absent']),
@@ -25,7 +27,7 @@ class TagGroup(BluecatModule):
 
     def exec_module(self, **kwargs):
         tag_group = self.get_tag_group()
-        tag_group_id = tag_group.get('id')
+        tag_group_id = tag_group.get('id') if tag_group else None
         if self.module.params.get('state') == 'present':
             if tag_group:
                 if self.compare_data(tag_group):
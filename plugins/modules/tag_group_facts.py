@@ -16,15 +16,7 @@ class TagGroupFacts(BluecatModule):
 
     def exec_module(self, **kwargs):
         results = dict(ansible_facts=dict(tagGroups=[]))
-        response = self.client.http_get('/tagGroups',
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            tagGroups = response['data']
-            results['ansible_facts']['tagGroups'] = tagGroups
+        results['ansible_facts']['tagGroups'] = self.get_facts('/tagGroups')
         return results
 
 def main():
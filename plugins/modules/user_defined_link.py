@@ -9,6 +9,8 @@ import json
 from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
 
 class UserDefinedLink(BluecatModule):
+    applied_key = ('configuration', 'name', 'source', 'source_type', 'destination', 'destination_type')
+
     def __init__(self):
         self.module_args = dict(
             name=dict(required=True, type='str'),
@@ -92,29 +94,18 @@ class UserDefinedLink(BluecatModule):
             return udls['data'][0]
 
     def get_udl_definition_id(self):
-        filter = 'displayName:eq("{}")'.format(self.module.params.get('name'))
-        udls = self.client.http_get('/userDefinedLinkDefinitions',
-                                    params={'limit': 1,
-                                            'filter': filter
-                                            }
-                                    )
-        if udls['count'] == 0:
+        udl_definition = self.get_user_defined_link_definition(self.module.params.get('name'))
+        if udl_definition is None:
             return None
         else:
-            return udls['data'][0]['id']
+            return udl_definition['id']
 
     def get_network_id(self, range):
-        filter = 'configuration.name:eq("{}") and range:eq("{}")'.format(self.module.params.get('configuration'), range)
-        networks = self.client.http_get('/networks',
-                                              params={'limit': 1,
-                                                      'filter': filter,
-                                                      'fields': 'embed(userDefinedLinks)'
-                                                     }
-                                              )
-        if networks['count'] == 0:
+        network = self.get_network_by_range(self.module.params.get('configuration'), range)
+        if network is None:
             return None
         else:
-            return networks['data'][0]['id']
+            return network['id']
 
     def build_data(self):
         data = dict()
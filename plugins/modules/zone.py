@@ -9,6 +9,9 @@ import json
 from ansible_collections.local.bluecat.plugins.module_utils.bc_util import BluecatModule
 
 class Zone(BluecatModule):
+    deployment_services = ('DNS',)
+    applied_key = ('configuration', 'view', 'zone', 'name')
+
     def __init__(self):
         self.module_args = dict(
             state=dict(type='str', default='present', choices=['present', 'absent']),
@@ -63,27 +66,18 @@ class Zone(BluecatModule):
             return networks['data'][0]
 
     def get_view_id(self):
-        filter = 'configuration.name:eq("{}") and name:eq("{}")'.format(self.module.params.get('configuration'), self.module.params.get('view'))
-        views = self.client.http_get('/views',
-                                              params={'limit': 1,
-                                                      'filter': filter
-                                                     }
-                                              )
-        if views['count'] == 0:
+        view = self.get_view_by_name(self.module.params.get('configuration'), self.module.params.get('view'))
+        if view is None:
             return None
         else:
-            return views['data'][0]['id']
+            return view['id']
 
     def get_parent_id(self):
-        filter = 'configuration.name:eq("{}") and absoluteName:eq("{}")'.format(self.module.params.get('configuration'), self.module.params.get('zone'))
-        block = self.client.http_get('/zones',
-                                     params={'limit': 1,
-                                             'filter': filter}
-                                     )
-        if block['count'] == 0:
+        parent = self.get_zone_by_fqdn(self.module.params.get('configuration'), self.module.params.get('zone'))
+        if parent is None:
             return None
         else:
-            return block['data'][0]['id']
+            return parent['id']
 
     def create_top_zone(self):
         changed = True
@@ -16,15 +16,7 @@ class ZoneFacts(BluecatModule):
 
     def exec_module(self, **kwargs):
         results = dict(ansible_facts=dict(zones=[]))
-        response = self.client.http_get('/zones',
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            zones = response['data']
-            results['ansible_facts']['zones'] = zones
+        results['ansible_facts']['zones'] = self.get_facts('/zones')
         return results
 
 def main():
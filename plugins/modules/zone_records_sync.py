@@ -0,0 +1,223 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2026, Philipp Fromme <philipp.fromme@uni-paderborn.de>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+import json
+
+import ipaddress
+from ansible_collections.local.bluecat.plugins.module_utils.bc_util import (BluecatModule, PAGE_SIZE, host_record_data,
+                                                                           in_filters, paginate)
+
+MANAGED_TYPES = ['HostRecord', 'AliasRecord', 'GenericRecord']
+
+class ZoneRecordsSync(BluecatModule):
+    deployment_services = ('DNS',)
+
+    def __init__(self):
+        self.module_args = dict(
+            configuration=dict(required=True, type='str'),
+            view=dict(required=True, type='str'),
+            zone=dict(required=True, type='str'),
+            records=dict(required=True, type='list', elements='dict',
+                         options=dict(
+                             name=dict(required=True, type='str'),
+                             type=dict(type='str', default='HostRecord', choices=MANAGED_TYPES),
+                             ttl=dict(type='int'),
+                             reverseRecord=dict(type='bool', default=True),
+                             addresses=dict(type='list', elements='str', default=[]),
+                             linked_record=dict(type='str'),
+                             record_type=dict(type='str'),
+                             rdata=dict(type='str')
+                         ),
+                         required_if=[
+                             ('type', 'AliasRecord', ['linked_record']),
+                             ('type', 'GenericRecord', ['record_type', 'rdata'])
+                         ]),
+            purge=dict(type='bool', default=False),
+            x_bcn_orphaned_address_state=dict(type='str', default=""),
+            concurrency=dict(type='int', default=4),
+            page_size=dict(type='int', default=PAGE_SIZE)
+        )
+
+        # absoluteName -> linkable reference of the records known in this run
+        self.linkable = dict()
+
+        super(ZoneRecordsSync, self).__init__(self.module_args,
+                                              supports_check_mode=True)
+
+    def exec_module(self, **kwargs):
+        zone = self.get_zone_by_fqdn(self.module.params.get('configuration'), self.module.params.get('zone'),
+                                     view=self.module.params.get('view'))
+        if zone is None:
+            self.fail_json(msg='Could not find zone {}!'.format(self.module.params.get('zone')))
+        zone_id = zone['id']
+
+        existing = self.get_resource_records(zone_id)
+        creates, updates, deletes = self.diff_records(existing)
+
+        failed = []
+        if not self.module.check_mode:
+            # aliases may link to records created here, deleted records may
+            # still be linked by aliases deleted here
+            address_ids = self.get_address_ids(self.module.params.get('configuration'),
+                                               set(y for x in creates + [z for _, z in updates]
+                                                   if x['type'] == 'HostRecord' for y in x['addresses']))
+            conflicting, deletes_last = self.split_conflicting(creates, deletes)
+            failed += self.delete_records(conflicting)
+            for phase in (lambda x: x['type'] != 'AliasRecord', lambda x: x['type'] == 'AliasRecord'):
+                requests = [('POST', f'/zones/{zone_id}/resourceRecords', x) for x in creates if phase(x)]
+                requests += [('PUT', f'/resourceRecords/{x}', y) for x, y in updates if phase(y)]
+                failed += self.apply(requests, address_ids)
+            failed += self.delete_records(deletes_last)
+
+        result = dict(changed=bool(creates or updates or deletes),
+                      created=[self.describe(x) for x in creates],
+                      updated=[self.describe(x) for _, x in updates],
+                      deleted=[self.describe(x) for x in deletes])
+        if failed:
+            self.fail_json(msg='Failed to apply {} of the record changes'.format(len(failed)),
+                           failed=failed, **result)
+        return result
+
+    def get_resource_records(self, zone_id):
+        existing = dict()
+        for rr in paginate(self.client, f'/zones/{zone_id}/resourceRecords',
+                           params={'fields': 'embed(addresses)'},
+                           page_size=self.module.params.get('page_size'),
+                           concurrency=self.module.params.get('concurrency')):
+            if rr.get('absoluteName'):
+                self.linkable[rr['absoluteName']] = {'id': rr['id'], 'type': rr['type']}
+            if rr['type'] in MANAGED_TYPES:
+                # a name can have several generic records of one type
+                existing.setdefault(self.existing_key(rr), []).append(rr)
+        return existing
+
+    def existing_key(self, rr):
+        if rr['type'] == 'GenericRecord':
+            return (rr['name'], rr['recordType'])
+        return (rr['name'], rr['type'])
+
+    def desired_key(self, record):
+        if record['type'] == 'GenericRecord':
+            return (record['name'], record['record_type'])
+        return (record['name'], record['type'])
+
+    def describe(self, record):
+        if record['type'] == 'GenericRecord':
+            return '{} {} {}'.format(record['name'], record.get('recordType', record.get('record_type')),
+                                     record['rdata'])
+        return '{} {}'.format(record['name'], record['type'])
+
+    def diff_records(self, existing):
+        creates = []
+        updates = []
+        records = self.module.params.get('records')
+        matched = [None] * len(records)
+        # records that are already as desired keep their match, the others
+        # take over the remaining records of their key
+        for unchanged in (True, False):
+            for i, record in enumerate(records):
+                candidates = existing.get(self.desired_key(record), [])
+                if matched[i] is not None or not candidates:
+                    continue
+                for rr in candidates:
+                    if not unchanged or not self.compare_data(rr, record):
+                        matched[i] = rr
+                        candidates.remove(rr)
+                        break
+        for record, rr in zip(records, matched):
+            if rr is None:
+                creates.append(record)
+            elif self.compare_data(rr, record):
+                updates.append((rr['id'], record))
+        deletes = []
+        if self.module.params.get('purge'):
+            deletes = [y for x in existing.values() for y in x]
+        return creates, updates, deletes
+
+    def compare_data(self, rr, record):
+        if record['ttl'] is not None and rr.get('ttl') != record['ttl']:
+            return True
+        if record['type'] == 'HostRecord':
+            if rr.get('reverseRecord') != record['reverseRecord']:
+                return True
+            ipam_addresses = [ipaddress.ip_address(x.get('address'))
+                              for x in rr.get('_embedded', {}).get('addresses', [])]
+            task_addresses = [ipaddress.ip_address(x) for x in record['addresses']]
+            return set(ipam_addresses) != set(task_addresses)
+        if record['type'] == 'AliasRecord':
+            return (rr.get('linkedRecord') or {}).get('absoluteName') != record['linked_record']
+        return rr.get('rdata') != record['rdata']
+
+    def split_conflicting(self, creates, deletes):
+        """Splits deletes into the records that must be gone before the
+        creates, because a record of another type is created with their name,
+        and the rest. Aliases linking to such records go first as well."""
+        names = set(x['name'].lower() for x in creates)
+        conflicting = [x for x in deletes if x['name'].lower() in names]
+        ids = set(x['id'] for x in conflicting)
+        conflicting += [x for x in deletes if x['id'] not in ids and x['type'] == 'AliasRecord' and
+                        (x.get('linkedRecord') or {}).get('id') in ids]
+        ids = set(x['id'] for x in conflicting)
+        return conflicting, [x for x in deletes if x['id'] not in ids]
+
+    def delete_records(self, records):
+        failed = self.apply([('DELETE', f'/resourceRecords/{x["id"]}', x) for x in records
+                             if x['type'] == 'AliasRecord'])
+        failed += self.apply([('DELETE', f'/resourceRecords/{x["id"]}', x) for x in records
+                              if x['type'] != 'AliasRecord'])
+        return failed
+
+    def resolve_linked_records(self, records):
+        missing = set(x['linked_record'] for x in records if x['linked_record'] not in self.linkable)
+        for absolute_name_filter in in_filters('absoluteName', sorted(missing)):
+            filter = 'configuration.name:eq("{}") and {}'.format(self.module.params.get('configuration'),
+                                                                absolute_name_filter)
+            for rr in paginate(self.client, '/resourceRecords', {'filter': filter}):
+                self.linkable[rr['absoluteName']] = {'id': rr['id'], 'type': rr['type']}
+
+    def build_data(self, record, address_ids):
+        if record['type'] == 'HostRecord':
+            return json.dumps(host_record_data(record['name'], record['reverseRecord'], record['addresses'],
+                                               address_ids, ttl=record['ttl']))
+        data = dict()
+        data['name'] = record['name']
+        data['type'] = record['type']
+        if record['ttl'] is not None:
+            data['ttl'] = record['ttl']
+        if record['type'] == 'AliasRecord':
+            data['linkedRecord'] = self.linkable.get(record['linked_record'])
+        else:
+            data['recordType'] = record['record_type']
+            data['rdata'] = record['rdata']
+        data = json.dumps(data)
+        return data
+
+    def apply(self, requests, address_ids=None):
+        if not requests:
+            return []
+        self.resolve_linked_records([x[2] for x in requests if x[0] != 'DELETE' and x[2]['type'] == 'AliasRecord'])
+        delete_headers = dict(self.headers)
+        delete_headers['x-bcn-orphaned-address-state'] = self.module.params.get('x_bcn_orphaned_address_state')
+        send = []
+        for method, url, record in requests:
+            if method == 'DELETE':
+                send.append((method, url, None, delete_headers))
+            else:
+                send.append((method, url, self.build_data(record, address_ids), self.headers))
+        results = self.send_requests(send, self.module.params.get('concurrency'))
+        failed = []
+        for (method, url, record), (response, error) in zip(requests, results):
+            if error:
+                failed.append({'record': self.describe(record), 'method': method, 'msg': error})
+            elif method == 'POST' and isinstance(response, dict) and response.get('absoluteName'):
+                self.linkable[response['absoluteName']] = {'id': response['id'], 'type': response['type']}
+        return failed
+
+def main():
+    ZoneRecordsSync()
+
+if __name__ == '__main__':
+    main()
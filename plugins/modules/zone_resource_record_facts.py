@@ -18,28 +18,15 @@ class ZoneResourceRecords(BluecatModule):
     def exec_module(self, **kwargs):
         results = dict(ansible_facts=dict(resource_records=[]))
         collection_id = self.get_zone_id()
-        response = self.client.http_get(f'/zones/{collection_id}/resourceRecords',
-                                        params={'limit': self.module.params.get('limit'),
-                                                'filter': self.module.params.get('filter'),
-                                                'fields': self.module.params.get('fields')
-                                                }
-                                        )
-        if response['count'] > 0:
-            resource_records = response['data']
-            results['ansible_facts']['resource_records'] = resource_records
+        results['ansible_facts']['resource_records'] = self.get_facts(f'/zones/{collection_id}/resourceRecords')
         return results
 
     def get_zone_id(self):
-        filter = 'configuration.name:eq("{}") and absoluteName:eq("{}")'.format(self.module.params.get('configuration'), self.module.params.get('zone'))
-        networks = self.client.http_get('/zones',
-                                         params={'limit': 1,
-                                                 'filter': filter
-                                                }
-                                        )
-        if networks['count'] == 0:
+        zone = self.get_zone_by_fqdn(self.module.params.get('configuration'), self.module.params.get('zone'))
+        if zone is None:
             return None
         else:
-            return networks['data'][0]['id']
+            return zone['id']
 
 def main():
     ZoneResourceRecords()
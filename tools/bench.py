@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# Copyright: (c) 2026, Philipp Fromme <philipp.fromme@uni-paderborn.de>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""Runs the modules of this collection against the mock BAM and reports, per
+operation, the API calls, repeated identical GET requests, wall time and peak
+RSS of the module process.
+
+Every module goes through its main paths, usually create, a no-op run with
+the same arguments, update and delete. Session requests are not counted as
+calls, they depend on bc_session_reuse rather than on the module.
+
+The results are compared with a baseline file. More calls or repeated
+lookups than in the baseline, or more than a limit set for an operation,
+fail the run, as does a wall time or peak RSS above the baseline by more than
+the tolerance. --update-baseline writes the current results instead.
+
+    python tools/bench.py
+    python tools/bench.py --only host_record network --latency 0.005
+    python tools/bench.py --update-baseline
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from mock_bam import MockServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, 'tools', 'bench_baseline.json')
+# seconds added to the time limit, module start-up alone varies this much
+TIME_SLACK = 0.2
+
+MAIN = {'configuration': 'main'}
+ZONE = dict(MAIN, view='default', zone='example.com')
+APPLIED = {'bc_applied_cache': True, 'bc_applied_dir': '{tmp}/applied', 'bc_applied_verify': 0.0}
+RECORDS = [{'name': 'bulk{}'.format(x), 'addresses': ['10.0.0.{}'.format(100 + x)]} for x in range(20)]
+RECORDS_UPDATED = [dict(x, addresses=['10.0.0.{}'.format(150 + i)]) if i < 5 else x for i, x in enumerate(RECORDS)]
+
+
+def step(op, changed=None, max_calls=None, max_repeats=None, measure=True, module=None, mock=None, **args):
+    """One run of a module. changed is the expected result, None if not
+    checked; max_calls and max_repeats are limits independent of the
+    baseline. Steps with measure=False only prepare the following ones.
+    mock changes the settings of the mock server for this run only."""
+    return {'op': op, 'args': args, 'changed': changed, 'max_calls': max_calls, 'max_repeats': max_repeats,
+            'measure': measure, 'module': module, 'mock': mock}
+
+
+# module: (arguments of all steps, steps)
+SCENARIOS = {
+    'configuration': ({'name': 'bench'}, [
+        step('create', True, description='one'),
+        step('noop', False, description='one'),
+        step('update', True, description='two'),
+        step('delete', True, state='absent'),
+    ]),
+    'view': (dict(MAIN, name='bench'), [
+        step('create', True),
+        step('noop', False),
+        step('delete', True, state='absent'),
+    ]),
+    'zone': (dict(MAIN, view='default', zone='example.com', name='bench'), [
+        step('create', True),
+        step('noop', False),
+        step('update', True, dynamicUpdateEnabled=True),
+        step('delete', True, state='absent'),
+    ]),
+    'block': (dict(MAIN, range='10.1.0.0/16'), [
+        step('create', True, name='b'),
+        step('noop', False, name='b'),
+        step('update', True, name='b2'),
+        step('delete', True, state='absent'),
+    ]),
+    'network': (dict(MAIN, range='10.0.1.0/24', defaultZones=['example.com']), [
+        step('create', True, max_repeats=0, name='n'),
+        step('noop', False, name='n'),
+        step('update', True, name='n2'),
+        step('delete', True, state='absent'),
+    ]),
+    'address': (dict(MAIN, address='10.0.0.10'), [
+        step('create', True, name='a'),
+        step('noop', False, name='a'),
+        step('update', True, name='a2'),
+        step('delete', True, state='absent'),
+    ]),
+    'host_record': (dict(ZONE, name='web', addresses=['10.0.0.20']), [
+        step('create', True),
+        step('noop', False, max_calls=3),
+        step('update', True, addresses=['10.0.0.21']),
+        step('delete', True, state='absent'),
+        step('cache-fill', True, **APPLIED),
+        step('cache-hit', False, max_calls=0, **APPLIED),
+        step('cache-drop', True, state='absent', **APPLIED),
+    ]),
+    'alias_record': (dict(ZONE, name='alias', linked_record='target.example.com'), [
+        step('setup', measure=False, module='host_record', name='target', addresses=['10.0.0.30'], **ZONE),
+        step('create', True),
+        step('noop', False),
+        step('delete', True, state='absent'),
+    ]),
+    'host_records': (dict(ZONE), [
+        step('create', True, records=RECORDS),
+        step('noop', False, records=RECORDS),
+        step('update', True, records=RECORDS_UPDATED),
+        step('delete', True, records=[dict(x, state='absent') for x in RECORDS_UPDATED]),
+    ]),
+    'zone_records_sync': (dict(ZONE), [
+        step('create', True, records=RECORDS),
+        step('noop', False, records=RECORDS),
+        step('update', True, records=RECORDS_UPDATED),
+        step('purge', True, records=RECORDS_UPDATED[:10], purge=True),
+    ]),
+    'address_allocate': (dict(MAIN, network='10.0.0.0/24', name='alloc'), [
+        step('allocate', True, count=5),
+        step('noop', False, count=5),
+    ]),
+    'tag_group': ({'name': 'bench'}, [
+        step('create', True),
+        step('noop', False),
+        step('delete', True, state='absent'),
+    ]),
+    'tag': ({'name': 'bench', 'tagGroup': 'default'}, [
+        step('create', True),
+        step('noop', False),
+        step('delete', True, state='absent'),
+    ]),
+    'collection_tag': (dict(MAIN, collection='networks', resource='10.0.0.0/24', name='managed',
+                            tagGroup='default'), [
+        step('create', True),
+        step('noop', False),
+        step('delete', True, state='absent'),
+    ]),
+    'group': ({'name': 'bench', 'groupType': 'ADDRESS_MANAGER'}, [
+        step('create', True),
+        step('noop', False),
+        step('update', True, administratorPrivilege=True),
+        step('delete', True, state='absent'),
+    ]),
+    'access_right': (dict(MAIN, userScope_name='admin', userScope_type='User', resource='10.0.0.0/24',
+                          resource_type='networks'), [
+        step('create', True, defaultAccessLevel='VIEW'),
+        step('noop', False, defaultAccessLevel='VIEW'),
+        step('update', True, defaultAccessLevel='CHANGE'),
+        step('delete', True, state='absent', defaultAccessLevel='CHANGE'),
+    ]),
+    'deployment_role': (dict(MAIN, collection='zones', resource='example.com', interface='dns1',
+                             type='DNSDeploymentRole'), [
+        step('create', True, roleType='PRIMARY'),
+        step('noop', False, roleType='PRIMARY'),
+        step('update', True, roleType='SECONDARY'),
+        step('delete', True, state='absent', roleType='SECONDARY'),
+    ]),
+    'user_defined_link': (dict(MAIN, name='uplink', source='10.0.0.0/24', source_type='networks',
+                               destination='10.0.2.0/24', destination_type='networks'), [
+        step('setup', measure=False, module='network', configuration='main', range='10.0.2.0/24'),
+        step('create', True),
+        step('noop', False),
+    ]),
+    'server_deployment': (dict(MAIN, name='dns1', type='FullDeployment', service='DNS'), [
+        step('deploy', True),
+    ]),
+    'server_deployments': (dict(MAIN, type='FullDeployment', service='DNS'), [
+        # the number of polls depends on timing, only the start is compared
+        step('deploy', True, wait=False),
+    ]),
+    'export_snapshot': (dict(MAIN, path='{tmp}/snapshot.db'), [
+        step('full', True),
+        step('incremental', incremental=True),
+    ]),
+    'configuration_facts': ({'filter': 'name:eq("main")'}, [
+        step('query'),
+        # a refused request is sent again, also if the error is not JSON
+        step('retry-json', max_calls=2, mock={'error_count': 1, 'error_status': [503], 'retry_after': 0}),
+        step('retry-html', max_calls=2, mock={'error_count': 1, 'error_status': [429], 'retry_after': 0,
+                                              'error_body': 'html'}),
+    ]),
+    'zone_facts': ({'filter': 'configuration.name:eq("main")', 'all': True}, [step('query')]),
+    'block_facts': ({'filter': 'configuration.name:eq("main")', 'all': True}, [step('query')]),
+    'network_facts': ({'filter': 'configuration.name:eq("main")', 'all': True}, [step('query')]),
+    'address_facts': ({'filter': 'configuration.name:eq("main")', 'all': True}, [step('query')]),
+    'resource_record_facts': ({'filter': 'type:eq("HostRecord")', 'all': True}, [step('query')]),
+    'zone_resource_record_facts': (dict(MAIN, zone='example.com', filter='type:eq("HostRecord")'),
+                                   [step('query')]),
+    'network_address_facts': ({'range': '10.0.0.0/24', 'filter': 'state:eq("STATIC")'}, [step('query')]),
+}
+
+
+def collection_root(tmp):
+    """Returns a directory with the repository as local.bluecat, so the
+    modules can be run with python -m."""
+    path = os.path.join(tmp, 'collections')
+    os.makedirs(os.path.join(path, 'ansible_collections', 'local'))
+    os.symlink(ROOT, os.path.join(path, 'ansible_collections', 'local', 'bluecat'))
+    return path
+
+
+def run_module(module, args, root, tmp):
+    args_file = os.path.join(tmp, 'args.json')
+    with open(args_file, 'w') as f:
+        json.dump({'ANSIBLE_MODULE_ARGS': args}, f)
+    env = dict(os.environ, PYTHONPATH=root)
+    started = time.monotonic()
+    process = subprocess.Popen([sys.executable, '-m', 'ansible_collections.local.bluecat.plugins.modules.' + module,
+                                args_file], stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env, cwd=tmp)
+    stdout, stderr = process.stdout.read(), process.stderr.read()
+    # wait4 returns the resource usage of just this process
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.monotonic() - started
+    try:
+        result = json.loads(stdout)
+    except ValueError:
+        result = {'failed': True, 'msg': (stderr or stdout).decode('utf-8', 'replace').strip()[-500:]}
+    # ru_maxrss is in kilobytes on Linux
+    return result, wall, usage.ru_maxrss / 1024.0
+
+
+def api_requests(server, start):
+    with server.counter_lock:
+        log = server.log[start:]
+    return [x for x in log if not x.split(' ', 1)[1].startswith('/sessions')]
+
+
+def repeats(requests):
+    gets = [x for x in requests if x.startswith('GET ')]
+    return len(gets) - len(set(gets))
+
+
+def run_scenarios(server, modules, root, tmp, address):
+    results = []
+    credentials = {'bc_address': address, 'bc_api_username': 'admin', 'bc_api_password': 'bench'}
+    for module in modules:
+        base, steps = SCENARIOS[module]
+        for item in steps:
+            # steps running another module only get their own arguments
+            args = dict(credentials, **(base if item['module'] is None else {}))
+            args.update(item['args'])
+            args = json.loads(json.dumps(args).replace('{tmp}', tmp))
+            with server.counter_lock:
+                start = len(server.log)
+            config = dict(server.config)
+            server.config.update(item['mock'] or {})
+            try:
+                result, wall, rss = run_module(item['module'] or module, args, root, tmp)
+            finally:
+                server.config.update(config)
+            if not item['measure']:
+                if result.get('failed'):
+                    raise RuntimeError('Setup of {} failed: {}'.format(module, result.get('msg')))
+                continue
+            requests = api_requests(server, start)
+            results.append({'module': module, 'op': item['op'], 'calls': len(requests),
+                            'repeats': repeats(requests), 'wall': round(wall, 3), 'rss': round(rss, 1),
+                            'changed': result.get('changed'), 'failed': bool(result.get('failed')),
+                            'msg': result.get('msg'), 'expected_changed': item['changed'],
+                            'max_calls': item['max_calls'], 'max_repeats': item['max_repeats']})
+    return results
+
+
+def check(results, baseline, tolerance):
+    """Returns the list of failures of the results."""
+    failures = []
+    for result in results:
+        name = '{} {}'.format(result['module'], result['op'])
+        if result['failed']:
+            failures.append('{}: module failed: {}'.format(name, result['msg']))
+            continue
+        if result['expected_changed'] is not None and result['changed'] != result['expected_changed']:
+            failures.append('{}: changed is {}, expected {}'.format(name, result['changed'],
+                                                                   result['expected_changed']))
+        if result['max_calls'] is not None and result['calls'] > result['max_calls']:
+            failures.append('{}: {} calls, at most {} allowed'.format(name, result['calls'], result['max_calls']))
+        if result['max_repeats'] is not None and result['repeats'] > result['max_repeats']:
+            failures.append('{}: {} repeated lookups, at most {} allowed'.format(name, result['repeats'],
+                                                                               result['max_repeats']))
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for field in ('calls', 'repeats'):
+            if result[field] > previous[field]:
+                failures.append('{}: {} {}, baseline {}'.format(name, result[field], field, previous[field]))
+        if tolerance is not None:
+            if result['wall'] > previous['wall'] * (1 + tolerance) + TIME_SLACK:
+                failures.append('{}: {}s wall time, baseline {}s'.format(name, result['wall'], previous['wall']))
+            if result['rss'] > previous['rss'] * (1 + tolerance):
+                failures.append('{}: {} MB peak RSS, baseline {} MB'.format(name, result['rss'], previous['rss']))
+    return failures
+
+
+def report(results, baseline):
+    print('{:<28} {:<12} {:>6} {:>8} {:>8} {:>8} {:>8} {:>8}'.format(
+        'MODULE', 'OPERATION', 'CALLS', 'BASE', 'REPEATS', 'WALL', 'RSS MB', 'CHANGED'))
+    for result in results:
+        previous = baseline.get('{} {}'.format(result['module'], result['op']), {})
+        print('{:<28} {:<12} {:>6} {:>8} {:>8} {:>7.3f}s {:>8.1f} {:>8}'.format(
+            result['module'], result['op'], result['calls'], previous.get('calls', '-'), result['repeats'],
+            result['wall'], result['rss'], 'failed' if result['failed'] else str(result['changed'])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the modules against the mock BAM.')
+    parser.add_argument('--only', nargs='+', choices=sorted(SCENARIOS), help='modules to run')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline file')
+    parser.add_argument('--update-baseline', action='store_true', help='write the results as new baseline')
+    parser.add_argument('--tolerance', type=float, default=1.0,
+                        help='allowed increase of wall time and peak RSS over the baseline, 1.0 is +100%%; '
+                             'negative to not compare them')
+    parser.add_argument('--latency', type=float, default=0.0, help='latency of the mock per request')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    baseline = dict()
+    if os.path.isfile(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    server = MockServer(('127.0.0.1', 0), latency=args.latency, deployment_time=0.1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    address = 'http://127.0.0.1:{}'.format(server.server_address[1])
+    tmp = tempfile.mkdtemp(prefix='bam-bench-')
+    try:
+        results = run_scenarios(server, args.only or list(SCENARIOS), collection_root(tmp), tmp, address)
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp)
+
+    report(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        baseline.update({'{} {}'.format(x['module'], x['op']): {y: x[y] for y in ('calls', 'repeats', 'wall', 'rss')}
+                         for x in results if not x['failed']})
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print('Baseline written to {}'.format(args.baseline))
+    failures = check(results, baseline if not args.update_baseline else dict(),
+                     args.tolerance if args.tolerance >= 0 else None)
+    for failure in failures:
+        print('FAIL ' + failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,679 @@
+#!/usr/bin/env python3
+# Copyright: (c) 2026, Philipp Fromme <philipp.fromme@uni-paderborn.de>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""Local stand-in for the BAM REST v2 API, for running the modules of this
+collection without an Address Manager.
+
+It keeps all objects in memory and implements the endpoints the modules use:
+sessions, configurations, views, zones, resourceRecords, blocks, networks,
+addresses, tags, tagGroups, accessRights, deploymentRoles, servers and their
+interfaces and deployments, users, groups, authenticators and
+userDefinedLinks. Collections accept filter, limit, offset, fields with
+embed() and orderBy; filters are evaluated with bc_filter, like snapshots.
+
+Latency and errors can be injected for every request. Deployments are queued
+and complete after --deployment-time seconds.
+
+Besides the API there are a few endpoints for tests and benchmarks:
+GET /mock/requests returns the number of requests per method and path and
+the list of all requests,
+POST /mock/reset restores the seed data and clears the counters and
+PATCH /mock/config changes latency, jitter, error_rate, error_status,
+retry_after, error_count, error_body and deployment_time at runtime.
+error_count fails that many of the following API requests, sessions aside,
+and error_body 'html' sends injected errors as an HTML page like a proxy or
+load balancer instead of a JSON error.
+
+    python tools/mock_bam.py --port 8080 --seed seed.json --latency 0.02
+"""
+
+import argparse
+import base64
+import copy
+import datetime
+import ipaddress
+import itertools
+import json
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins', 'module_utils'))
+from bc_filter import IP_FIELDS, FilterError, compile_filter, get_field, ip_value, select_fields  # noqa: E402
+
+API_PREFIX = '/api/v2'
+SESSION_TTL = 3600
+
+# type of the objects created in a collection without an explicit type
+DEFAULT_TYPES = {
+    'configurations': 'Configuration',
+    'views': 'View',
+    'zones': 'Zone',
+    'resourceRecords': 'GenericRecord',
+    'tagGroups': 'TagGroup',
+    'tags': 'Tag',
+    'servers': 'Server',
+    'interfaces': 'NetworkInterface',
+    'deploymentRoles': 'DNSDeploymentRole',
+    'accessRights': 'AccessRight',
+    'users': 'User',
+    'groups': 'UserGroup',
+    'authenticators': 'LDAPAuthenticator',
+    'userDefinedLinkDefinitions': 'UserDefinedLinkDefinition',
+}
+# collections addressed by range or address, typed by the IP version
+IP_TYPES = {
+    'blocks': ('range', 'IPv4Block', 'IPv6Block'),
+    'networks': ('range', 'IPv4Network', 'IPv6Network'),
+    'addresses': ('address', 'IPv4Address', 'IPv6Address'),
+}
+# fields that make an object unique among the objects of its scope
+UNIQUE_FIELDS = {
+    'configurations': 'name',
+    'views': 'name',
+    'zones': 'absoluteName',
+    'blocks': 'range',
+    'networks': 'range',
+    'addresses': 'address',
+    'tagGroups': 'name',
+    'servers': 'name',
+    'users': 'name',
+    'groups': 'name',
+}
+# collections that can be nested in a seed file
+COLLECTIONS = set(DEFAULT_TYPES) | set(IP_TYPES)
+# the parent collections under which a tag is created rather than linked
+TAG_PARENTS = ('tagGroups', 'tags')
+DEPLOYMENT_STATES = ('QUEUED', 'RUNNING', 'COMPLETED')
+
+DEFAULT_SEED = {
+    'configurations': [{
+        'name': 'main',
+        'views': [{'name': 'default', 'zones': [{'name': 'example.com'}]}],
+        'blocks': [{'range': '10.0.0.0/8', 'networks': [{'range': '10.0.0.0/24', 'gateway': '10.0.0.1'}]},
+                   {'range': '2001:db8::/32', 'networks': [{'range': '2001:db8::/64'}]}],
+        'servers': [{'name': 'dns1', 'interfaces': [{'name': 'dns1'}]}],
+    }],
+    'users': [{'name': 'admin'}],
+    'groups': [{'name': 'admins'}],
+    'authenticators': [{'name': 'ldap'}],
+    'tagGroups': [{'name': 'default', 'tags': [{'name': 'managed'}]}],
+    'userDefinedLinkDefinitions': [{'displayName': 'uplink', 'linkType': 'uplink'}],
+}
+
+REASONS = {400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found', 405: 'Method Not Allowed',
+           409: 'Conflict', 429: 'Too Many Requests', 500: 'Internal Server Error', 502: 'Bad Gateway',
+           503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+
+class MockError(Exception):
+    def __init__(self, status, code, message):
+        super(MockError, self).__init__(message)
+        self.status = status
+        self.code = code
+
+
+def path_template(path):
+    return re.sub(r'/\d+(?=/|$)', '/{id}', path)
+
+
+def reference(obj, *fields):
+    ref = {'id': obj['id'], 'type': obj['type']}
+    for field in fields:
+        ref[field] = obj.get(field)
+    return ref
+
+
+def order_key(order_by):
+    # orderBy=desc(name) or orderBy=name
+    match = re.match(r'^(asc|desc)\((.+)\)$', order_by)
+    direction, field = match.groups() if match else ('asc', order_by)
+
+    def key(obj):
+        value = get_field(obj, field)
+        if field.split('.')[-1] in IP_FIELDS and ip_value(value) is not None:
+            # ranges sort by address, then from the largest to the smallest
+            network = ip_value(value)
+            return (False, (network.version, int(network.network_address), network.prefixlen))
+        return (value is None, str(value) if not isinstance(value, (int, float)) else value)
+    return key, direction == 'desc'
+
+
+class Store():
+    """All objects of the mock, by ID, with their collection and parent."""
+
+    def __init__(self, seed, deployment_time=1.0):
+        self.seed = seed
+        self.deployment_time = deployment_time
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.ids = itertools.count(100001)
+            self.objects = dict()
+            self.collection = dict()
+            self.parent = dict()
+            # id -> set of linked tag ids, id -> {destination id: link}
+            self.tags = dict()
+            self.links = dict()
+            self.sessions = dict()
+            self.load(self.seed)
+
+    def load(self, tree, parent_id=None):
+        for collection, objects in tree.items():
+            for data in objects:
+                children = dict()
+                if collection != 'resourceRecords':
+                    # the addresses of a host record are not child objects
+                    children = {x: y for x, y in data.items() if isinstance(y, list) and x in COLLECTIONS}
+                data = {x: y for x, y in data.items() if x not in children}
+                obj = self.create(collection, data, parent_id)
+                self.load(children, obj['id'])
+
+    def get(self, id, collection=None):
+        if id not in self.objects or (collection is not None and self.collection[id] != collection):
+            raise MockError(404, 'ObjectNotFound', 'No {} with id {}'.format(collection or 'object', id))
+        return self.objects[id]
+
+    def children(self, parent_id, collection):
+        return [y for x, y in self.objects.items()
+                if self.parent.get(x) == parent_id and self.collection[x] == collection]
+
+    def in_collection(self, collection):
+        return [y for x, y in self.objects.items() if self.collection[x] == collection]
+
+    def ancestor(self, parent_id, collection):
+        while parent_id is not None:
+            if self.collection[parent_id] == collection:
+                return self.objects[parent_id]
+            parent_id = self.parent.get(parent_id)
+        return None
+
+    def create(self, collection, data, parent_id=None):
+        obj = dict(data)
+        obj['id'] = next(self.ids)
+        self.derive(collection, obj, parent_id)
+        self.check_unique(collection, obj, parent_id)
+        self.objects[obj['id']] = obj
+        self.collection[obj['id']] = collection
+        self.parent[obj['id']] = parent_id
+        if collection == 'networks' and obj.get('gateway'):
+            self.create('addresses', {'address': obj['gateway'], 'state': 'GATEWAY'}, obj['id'])
+        return obj
+
+    def derive(self, collection, obj, parent_id):
+        """Fills in the type, the references and the modification time BAM
+        adds to an object."""
+        # microseconds keep the order of changes in the same second
+        obj['modifiedTime'] = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        if collection in IP_TYPES:
+            field, ipv4, ipv6 = IP_TYPES[collection]
+            value = obj.get(field)
+            try:
+                ip = ipaddress.ip_network(value, strict=False) if field == 'range' else ipaddress.ip_address(value)
+            except (TypeError, ValueError):
+                raise MockError(400, 'InvalidValue', 'Invalid {} {}'.format(field, value))
+            obj[field] = str(ip)
+            obj['type'] = ipv4 if ip.version == 4 else ipv6
+            self.check_contained(collection, obj, parent_id)
+        else:
+            obj.setdefault('type', DEFAULT_TYPES.get(collection, collection))
+        if collection == 'addresses':
+            obj.setdefault('state', 'STATIC')
+            obj.setdefault('name', None)
+        configuration = self.ancestor(parent_id, 'configurations')
+        if configuration is not None:
+            obj['configuration'] = reference(configuration, 'name')
+        view = self.ancestor(parent_id, 'views')
+        if view is not None and collection in ('zones', 'resourceRecords'):
+            obj['view'] = reference(view, 'name')
+        if collection == 'zones':
+            parent = self.ancestor(parent_id, 'zones')
+            name = obj.get('name')
+            obj['absoluteName'] = name if parent is None else '{}.{}'.format(name, parent['absoluteName'])
+        if collection == 'resourceRecords':
+            zone = self.ancestor(parent_id, 'zones')
+            if zone is not None:
+                obj['zone'] = reference(zone, 'name', 'absoluteName')
+                name = obj.get('name')
+                obj['absoluteName'] = '{}.{}'.format(name, zone['absoluteName']) if name else zone['absoluteName']
+            if obj['type'] == 'HostRecord':
+                obj['addresses'] = [self.record_address(x, configuration) for x in obj.get('addresses') or []]
+        if collection == 'tags' and parent_id is not None:
+            obj['tagGroup'] = reference(self.ancestor(parent_id, 'tagGroups') or self.objects[parent_id], 'name')
+        if collection == 'accessRights' and obj.get('resource'):
+            resource = self.get(obj['resource'].get('id'))
+            obj['resource'] = reference(resource)
+
+    def check_contained(self, collection, obj, parent_id):
+        if parent_id is None or self.collection[parent_id] not in ('blocks', 'networks'):
+            return
+        parent = ipaddress.ip_network(self.objects[parent_id]['range'])
+        if collection == 'addresses':
+            inside = ipaddress.ip_address(obj['address']) in parent
+        else:
+            value = ipaddress.ip_network(obj['range'])
+            inside = value.version == parent.version and value.subnet_of(parent)
+        if not inside:
+            raise MockError(409, 'InvalidParent', '{} is not inside {}'.format(
+                obj.get('range') or obj.get('address'), parent))
+
+    def check_unique(self, collection, obj, parent_id, exclude=None):
+        if collection == 'resourceRecords':
+            self.check_alias(obj, exclude)
+        field = UNIQUE_FIELDS.get(collection)
+        if field is None:
+            return
+        scope = obj.get('configuration', {}).get('id')
+        if collection == 'zones':
+            scope = obj.get('view', {}).get('id')
+        elif collection in ('views', 'servers'):
+            scope = parent_id
+        value = str(obj.get(field)).lower()
+        for other in self.in_collection(collection):
+            if other['id'] == exclude:
+                continue
+            other_scope = other.get('configuration', {}).get('id')
+            if collection == 'zones':
+                other_scope = other.get('view', {}).get('id')
+            elif collection in ('views', 'servers'):
+                other_scope = self.parent.get(other['id'])
+            if other_scope == scope and str(other.get(field)).lower() == value:
+                raise MockError(409, 'DuplicateObject', 'A {} with {} {} already exists'.format(
+                    obj['type'], field, obj.get(field)))
+
+    def check_alias(self, obj, exclude=None):
+        """An alias record cannot share its name with any other record, like
+        a CNAME."""
+        for other in self.in_collection('resourceRecords'):
+            if other['id'] == exclude or other.get('view', {}).get('id') != obj.get('view', {}).get('id'):
+                continue
+            if str(other.get('absoluteName')).lower() != str(obj.get('absoluteName')).lower():
+                continue
+            if 'AliasRecord' in (obj['type'], other['type']):
+                raise MockError(409, 'DuplicateObject', 'A {} named {} already exists'.format(
+                    other['type'], obj.get('absoluteName')))
+
+    def record_address(self, ref, configuration):
+        """Resolves an address of a host record, creating it in the deepest
+        network containing it like BAM does."""
+        if isinstance(ref, str):
+            ref = {'address': ref}
+        if ref.get('id') is not None:
+            address = self.get(ref['id'], 'addresses')
+            return reference(address, 'address')
+        value = str(ipaddress.ip_address(ref.get('address')))
+        network = None
+        for obj in self.in_collection('addresses'):
+            if obj['address'] == value and obj.get('configuration', {}).get('id') == configuration['id']:
+                return reference(obj, 'address')
+        for obj in self.in_collection('networks'):
+            if obj.get('configuration', {}).get('id') != configuration['id']:
+                continue
+            range = ipaddress.ip_network(obj['range'])
+            if range.version == ipaddress.ip_address(value).version and ipaddress.ip_address(value) in range:
+                if network is None or range.prefixlen > ipaddress.ip_network(network['range']).prefixlen:
+                    network = obj
+        if network is None:
+            raise MockError(404, 'ObjectNotFound', 'No network contains {}'.format(value))
+        address = self.create('addresses', {'address': value, 'state': 'STATIC'}, network['id'])
+        return reference(address, 'address')
+
+    def update(self, id, data, merge=False):
+        obj = self.get(id)
+        collection = self.collection[id]
+        updated = dict(obj) if merge else {x: y for x, y in obj.items() if x in ('id', 'type')}
+        updated.update(data)
+        updated['id'] = id
+        self.derive(collection, updated, self.parent[id])
+        self.check_unique(collection, updated, self.parent[id], exclude=id)
+        self.objects[id] = updated
+        return updated
+
+    def delete(self, id):
+        self.get(id)
+        for child in [x for x, y in self.parent.items() if y == id]:
+            self.delete(child)
+        for store in (self.objects, self.collection, self.parent, self.tags, self.links):
+            store.pop(id, None)
+        for tags in self.tags.values():
+            tags.discard(id)
+
+    def deployment(self, obj):
+        # the state follows from the time since the deployment was queued
+        elapsed = time.time() - obj['_queued']
+        step = min(len(DEPLOYMENT_STATES) - 1, int(elapsed / max(self.deployment_time, 1e-6) * 2))
+        shown = {x: y for x, y in obj.items() if not x.startswith('_')}
+        shown['state'] = DEPLOYMENT_STATES[step]
+        return shown
+
+    def show(self, obj):
+        if '_queued' in obj:
+            return self.deployment(obj)
+        return obj
+
+    def embed(self, obj, fields):
+        """Adds the objects named in the embed() parts of fields to _embedded."""
+        names = re.findall(r'embed\(([^)]*)\)', fields or '')
+        if not names:
+            return obj
+        obj = copy.deepcopy(obj)
+        embedded = obj.setdefault('_embedded', dict())
+        for name in names:
+            if name == 'tags':
+                embedded['tags'] = [self.objects[x] for x in sorted(self.tags.get(obj['id'], ()))]
+                continue
+            value = obj.get(name)
+            refs = value if isinstance(value, list) else [value] if isinstance(value, dict) else []
+            embedded[name] = [self.objects[x['id']] for x in refs if x.get('id') in self.objects]
+        return obj
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately, do not wait for delayed ACKs
+    disable_nagle_algorithm = True
+    server_version = 'MockBAM/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super(Handler, self).log_message(format, *args)
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def do_PUT(self):
+        self.handle_request('PUT')
+
+    def do_PATCH(self):
+        self.handle_request('PATCH')
+
+    def do_DELETE(self):
+        self.handle_request('DELETE')
+
+    def handle_request(self, method):
+        url = urlsplit(self.path)
+        params = {x: y[-1] for x, y in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        server = self.server
+        try:
+            if url.path.startswith('/mock/'):
+                return self.reply(200, server.control(method, url.path, body))
+            if not url.path.startswith(API_PREFIX):
+                raise MockError(404, 'NotFound', 'Unknown path {}'.format(url.path))
+            path = url.path[len(API_PREFIX):]
+            server.count(method, path, self.path[len(API_PREFIX):])
+            delay = server.config['latency'] + random.uniform(0, server.config['jitter'])
+            if delay > 0:
+                time.sleep(delay)
+            if server.inject_error(path):
+                headers = {}
+                if server.config['retry_after'] is not None:
+                    headers['Retry-After'] = str(server.config['retry_after'])
+                status = random.choice(server.config['error_status'])
+                if server.config['error_body'] == 'html':
+                    return self.page(status, headers)
+                return self.error(MockError(status, 'InjectedError', 'Injected error'), headers)
+            data = json.loads(body) if body else None
+            status, result = server.api(method, path, params, data, self.headers.get('Authorization'))
+            self.reply(status, result)
+        except MockError as e:
+            self.error(e)
+        except ValueError as e:
+            self.error(MockError(400, 'InvalidValue', str(e)))
+
+    def error(self, exc, headers=None):
+        body = {'status': exc.status, 'reason': REASONS.get(exc.status, 'Error'), 'code': exc.code,
+                'message': str(exc)}
+        self.reply(exc.status, body, headers)
+
+    def page(self, status, headers=None):
+        reason = REASONS.get(status, 'Error')
+        content = '<html><body><h1>{} {}</h1></body></html>'.format(status, reason).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def reply(self, status, body, headers=None):
+        content = b'' if body is None else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        if body is not None:
+            self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, seed=None, latency=0.0, jitter=0.0, error_rate=0.0, error_status=(503,),
+                 retry_after=None, deployment_time=1.0, verbose=False, error_body='json'):
+        super(MockServer, self).__init__(address, Handler)
+        self.store = Store(DEFAULT_SEED if seed is None else seed, deployment_time)
+        self.config = {'latency': latency, 'jitter': jitter, 'error_rate': error_rate,
+                       'error_status': list(error_status), 'retry_after': retry_after,
+                       'error_count': 0, 'error_body': error_body, 'deployment_time': deployment_time}
+        self.verbose = verbose
+        self.requests = dict()
+        # every request as 'METHOD /path?query', to find repeated lookups
+        self.log = []
+        self.counter_lock = threading.Lock()
+
+    def inject_error(self, path):
+        with self.counter_lock:
+            if self.config['error_count'] > 0 and not path.startswith('/sessions'):
+                self.config['error_count'] -= 1
+                return True
+        return random.random() < self.config['error_rate']
+
+    def count(self, method, path, url):
+        key = '{} {}'.format(method, path_template(path))
+        with self.counter_lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.log.append('{} {}'.format(method, url))
+
+    def control(self, method, path, body):
+        if path == '/mock/requests' and method == 'GET':
+            with self.counter_lock:
+                return {'total': sum(self.requests.values()), 'requests': dict(self.requests), 'log': list(self.log)}
+        if path == '/mock/reset' and method == 'POST':
+            self.store.reset()
+            with self.counter_lock:
+                self.requests = dict()
+                self.log = []
+            return {'reset': True}
+        if path == '/mock/config' and method in ('GET', 'PATCH'):
+            if method == 'PATCH':
+                changes = json.loads(body or b'{}')
+                unknown = set(changes) - set(self.config)
+                if unknown:
+                    raise MockError(400, 'InvalidValue', 'Unknown settings {}'.format(', '.join(sorted(unknown))))
+                self.config.update(changes)
+                self.store.deployment_time = self.config['deployment_time']
+            return self.config
+        raise MockError(404, 'NotFound', 'Unknown path {}'.format(path))
+
+    def api(self, method, path, params, data, authorization):
+        store = self.store
+        segments = [x for x in path.split('/') if x]
+        with store.lock:
+            if segments[:1] == ['sessions']:
+                return self.sessions(method, segments, data, authorization)
+            self.authenticate(authorization)
+            if method == 'GET':
+                return 200, self.get(segments, params)
+            if method == 'POST':
+                return 201, self.post(segments, data or {})
+            if method in ('PUT', 'PATCH'):
+                if len(segments) != 2 or not segments[1].isdigit():
+                    raise MockError(405, 'MethodNotAllowed', 'Cannot {} {}'.format(method, path))
+                return 200, store.update(int(segments[1]), data or {}, merge=method == 'PATCH')
+            if method == 'DELETE':
+                self.delete(segments)
+                return 204, None
+        raise MockError(405, 'MethodNotAllowed', 'Cannot {} {}'.format(method, path))
+
+    def sessions(self, method, segments, data, authorization):
+        store = self.store
+        if method == 'POST' and len(segments) == 1:
+            if not data or not data.get('username'):
+                raise MockError(401, 'InvalidCredentials', 'Missing username')
+            token = secrets.token_hex(16)
+            credentials = base64.b64encode('{}:{}'.format(data['username'], token).encode()).decode()
+            expires = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=SESSION_TTL)
+            session = {'id': next(store.ids), 'type': 'UserSession', 'state': 'LOGGED_IN',
+                       'apiToken': token, 'basicAuthenticationCredentials': credentials,
+                       'apiTokenExpirationDateTime': expires.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                       'readOnly': False, 'user': {'name': data['username']}}
+            store.sessions['Basic ' + credentials] = session
+            return 201, session
+        session = self.authenticate(authorization)
+        if method == 'GET' and segments[1:] == ['current']:
+            return 200, session
+        if method == 'PATCH' and segments[1:] == [str(session['id'])]:
+            if (data or {}).get('state') == 'LOGGED_OUT':
+                store.sessions.pop(authorization, None)
+                session = dict(session, state='LOGGED_OUT')
+            return 200, session
+        raise MockError(404, 'ObjectNotFound', 'Unknown session endpoint')
+
+    def authenticate(self, authorization):
+        session = self.store.sessions.get(authorization)
+        if session is None:
+            raise MockError(401, 'InvalidAuthorizationToken', 'The session is not valid or has expired')
+        return session
+
+    def get(self, segments, params):
+        store = self.store
+        if len(segments) == 2 and segments[1].isdigit():
+            obj = store.show(store.get(int(segments[1]), segments[0]))
+            return select_fields(store.embed(obj, params.get('fields')), params.get('fields'))
+        if len(segments) == 1:
+            objects = store.in_collection(segments[0])
+        elif len(segments) == 3 and segments[1].isdigit():
+            parent_id = int(segments[1])
+            store.get(parent_id, segments[0])
+            objects = self.related(segments[0], parent_id, segments[2])
+        else:
+            raise MockError(404, 'NotFound', 'Unknown path /{}'.format('/'.join(segments)))
+        try:
+            predicate = compile_filter(params.get('filter'))
+        except FilterError as e:
+            raise MockError(400, 'InvalidFilter', str(e))
+        objects = [store.show(x) for x in objects]
+        objects = [x for x in objects if predicate(x)]
+        if params.get('orderBy'):
+            key, reverse = order_key(params['orderBy'])
+            objects.sort(key=key, reverse=reverse)
+        total = len(objects)
+        offset = int(params.get('offset') or 0)
+        limit = int(params['limit']) if params.get('limit') else None
+        objects = objects[offset:None if limit is None else offset + limit]
+        data = [select_fields(store.embed(x, params.get('fields')), params.get('fields')) for x in objects]
+        result = {'count': len(data), 'data': data}
+        if params.get('total') == 'true':
+            result['totalCount'] = total
+        return result
+
+    def related(self, collection, parent_id, name):
+        store = self.store
+        if name == 'tags' and collection not in TAG_PARENTS:
+            return [store.objects[x] for x in sorted(store.tags.get(parent_id, ()))]
+        if name == 'accessRights':
+            return [x for x in store.in_collection('accessRights') if x.get('resource', {}).get('id') == parent_id]
+        if name == 'userDefinedLinks':
+            return list(store.links.get(parent_id, {}).values())
+        return store.children(parent_id, name)
+
+    def post(self, segments, data):
+        store = self.store
+        if len(segments) == 1:
+            return store.create(segments[0], data)
+        if len(segments) != 3 or not segments[1].isdigit():
+            raise MockError(404, 'NotFound', 'Unknown path /{}'.format('/'.join(segments)))
+        collection, parent_id, name = segments[0], int(segments[1]), segments[2]
+        store.get(parent_id, collection)
+        if name == 'tags' and collection not in TAG_PARENTS:
+            tag = store.get(data.get('id'), 'tags')
+            store.tags.setdefault(parent_id, set()).add(tag['id'])
+            return tag
+        if name == 'userDefinedLinks':
+            destination = store.get(data.get('id'))
+            link = dict(reference(destination), linkDefinition=data.get('linkDefinition'),
+                        linkDescription=data.get('linkDescription'))
+            store.links.setdefault(parent_id, dict())[destination['id']] = link
+            return link
+        if name == 'deployments':
+            obj = store.create('deployments', dict(data, type=data.get('type', 'FullDeployment'),
+                                                   _queued=time.time()), parent_id)
+            return store.show(obj)
+        return store.create(name, data, parent_id)
+
+    def delete(self, segments):
+        store = self.store
+        if len(segments) == 2 and segments[1].isdigit():
+            return store.delete(int(segments[1]))
+        if len(segments) == 4 and segments[1].isdigit() and segments[3].isdigit():
+            parent_id, id = int(segments[1]), int(segments[3])
+            if segments[2] == 'tags':
+                if id not in store.tags.get(parent_id, ()):
+                    raise MockError(404, 'ObjectNotFound', 'Tag {} is not linked to {}'.format(id, parent_id))
+                store.tags[parent_id].discard(id)
+                return
+            if segments[2] == 'userDefinedLinks':
+                if store.links.get(parent_id, {}).pop(id, None) is None:
+                    raise MockError(404, 'ObjectNotFound', 'No link from {} to {}'.format(parent_id, id))
+                return
+        raise MockError(405, 'MethodNotAllowed', 'Cannot DELETE /{}'.format('/'.join(segments)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the BAM REST v2 API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--seed', help='JSON file with the initial objects, nested by collection')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random seconds added on top of the latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests failing, 0 to 1')
+    parser.add_argument('--error-status', type=int, nargs='+', default=[503], help='statuses of failed requests')
+    parser.add_argument('--retry-after', type=int, help='Retry-After header of failed requests')
+    parser.add_argument('--error-body', choices=['json', 'html'], default='json',
+                        help='body of failed requests, html like the error page of a proxy')
+    parser.add_argument('--deployment-time', type=float, default=1.0, help='seconds until a deployment completes')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    seed = None
+    if args.seed:
+        with open(args.seed) as f:
+            seed = json.load(f)
+    server = MockServer((args.host, args.port), seed, args.latency, args.jitter, args.error_rate,
+                        args.error_status, args.retry_after, args.deployment_time, args.verbose,
+                        args.error_body)
+    print('Mock BAM listening on http://{}:{}'.format(*server.server_address[:2]), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()